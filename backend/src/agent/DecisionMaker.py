@@ -4,7 +4,6 @@ import json
 import os
 import sys
 import tempfile
-import time
 import uuid
 from typing import Optional, Dict, Any, List
 from dotenv import load_dotenv
@@ -124,7 +123,6 @@ class DecisionMaker:
     ) -> WebObservation:
         """构造本地操作的观测对象。"""
         return WebObservation(
-            observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
             current_url=domain,
             http_status_code=status_code,
             page_load_time_ms=0,
@@ -273,7 +271,6 @@ class DecisionMaker:
                                 message=f"User cancelled dangerous operation: {danger_reason}",
                             )
                             observation = WebObservation(
-                                observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                                 current_url="local://system",
                                 http_status_code=403,
                                 page_load_time_ms=0,
@@ -292,7 +289,6 @@ class DecisionMaker:
                             message=f"Dangerous operation requires confirmation, but no callback provided: {danger_reason}",
                         )
                         observation = WebObservation(
-                            observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                             current_url="local://system",
                             http_status_code=403,
                             page_load_time_ms=0,
@@ -377,7 +373,6 @@ class DecisionMaker:
                     )
 
                 observation = WebObservation(
-                    observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                     current_url="local://system",
                     http_status_code=200 if fb.status == "SUCCESS" else 500,
                     page_load_time_ms=0,
@@ -465,7 +460,6 @@ class DecisionMaker:
                 )
 
                 observation = WebObservation(
-                    observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                     current_url="local://notepad",
                     http_status_code=200 if fb.status == "SUCCESS" else 500,
                     page_load_time_ms=0,
@@ -496,7 +490,6 @@ class DecisionMaker:
                                 message=f"User cancelled dangerous operation: {danger_reason}",
                             )
                             observation = WebObservation(
-                                observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                                 current_url="local://office",
                                 http_status_code=403,
                                 page_load_time_ms=0,
@@ -597,7 +590,6 @@ class DecisionMaker:
                     )
 
                 observation = WebObservation(
-                    observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                     current_url="local://office",
                     http_status_code=200 if fb.status == "SUCCESS" else 500,
                     page_load_time_ms=0,
@@ -628,7 +620,6 @@ class DecisionMaker:
             console.print(f"[red][CRITICAL] Unhandled Exception in Action Execution: {e}[/red]")
             # 返回兜底的失败观测，防止程序崩溃，允许 Planner 尝试恢复
             return WebObservation(
-                observation_timestamp_utc=time.strftime("%Y-%m-%dT%H:%M:%S"),
                 current_url="unknown",
                 http_status_code=500,
                 page_load_time_ms=0,
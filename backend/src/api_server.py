@@ -2,6 +2,7 @@
 FastAPI Web服务器：为前端提供RESTful API和WebSocket支持
 """
 
+import logging
 import os
 import sys
 import uuid
@@ -25,9 +26,15 @@ sys.path.insert(0, str(project_root))
 
 from backend.src.data_models.decision_engine.decision_models import TaskGoal, ExecutionNode, ExecutionNodeStatus
 from backend.src.agent.DecisionMaker import DecisionMaker
+from backend.src.services.BrowserService import shutdown_browser_pool
 
 load_dotenv()
 
+# 运行日志：BrowserService 等模块只记录，处理器与级别在入口统一配置
+logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
+if os.getenv("BROWSER_DEBUG", "False").lower() == "true":
+    logging.getLogger("backend").setLevel(logging.DEBUG)
+
 app = FastAPI(title="AI Web Agent Industrial API")
 
 # CORS配置
@@ -118,7 +125,7 @@ def _node_to_dict(node: ExecutionNode) -> dict:
             "expected_outcome": node.action.expected_outcome,
             "on_failure_action": node.action.on_failure_action,
         },
-        "current_status": node.current_status.value,
+        "current_status": node.current_status.name,
         "failure_reason": node.failure_reason,
         "required_precondition": node.required_precondition,
         "expected_cost_units": node.expected_cost_units,
@@ -271,26 +278,21 @@ def _run_task_in_thread(task_uuid: str, description: str, headless: bool):
             "message": error_msg,
         }))
     finally:
-        # 注意：不要立即关闭浏览器，因为前端可能还需要查看截图
-        # 延迟关闭浏览器，给前端一些时间获取最后的截图
-        def delayed_close():
-            import time
-            time.sleep(5)  # 等待5秒
-            if task_uuid in task_executors:
-                executor = task_executors[task_uuid]
-                if executor.browser_service:
-                    try:
-                        executor.close()
-                    except:
-                        pass
-                del task_executors[task_uuid]
-        
-        import threading
-        close_thread = threading.Thread(target=delayed_close, daemon=True)
-        close_thread.start()
-        
         loop.close()
 
+        # 注意：不要立即关闭浏览器，因为前端可能还需要查看截图
+        # 延迟关闭浏览器，给前端一些时间获取最后的截图。
+        # Playwright 同步对象只能由创建它的线程操作，因此在本线程内等待并关闭，
+        # 随后释放本线程的浏览器进程，避免工作线程结束后浏览器残留
+        time.sleep(5)  # 等待5秒
+        executor = task_executors.pop(task_uuid, None)
+        if executor is not None and executor.browser_service:
+            try:
+                executor.close()
+            except Exception:
+                pass
+        shutdown_browser_pool()
+
 
 @app.post("/api/tasks", response_model=TaskResponse)
 async def create_task(request: TaskCreateRequest):
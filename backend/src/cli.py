@@ -10,10 +10,10 @@
     python -m backend.src.cli
 """
 
+import logging
 import os
 import sys
 import uuid
-from typing import List
 from datetime import datetime
 
 # 修复Windows控制台编码问题
@@ -39,16 +39,16 @@ if sys.platform == "win32":
             pass
 
 from dotenv import load_dotenv
-from rich.console import Console
+from rich.console import Console, Group
 from rich.panel import Panel
 from rich.prompt import Prompt, Confirm
 from rich.table import Table
 from rich.layout import Layout
-from rich.columns import Columns
 from rich.text import Text
-from rich.align import Align
 from rich import box
 
+from pydantic import TypeAdapter
+
 from backend.src.data_models.decision_engine.decision_models import TaskGoal
 from backend.src.agent.DecisionMaker import DecisionMaker
 
@@ -58,9 +58,44 @@ try:
 except Exception:
     console = Console()
 
-
-def _print_banner() -> None:
-    """打印精美的启动横幅。"""
+# TaskGoal 校验器只构建一次，交互循环中的每个任务直接复用
+_TASK_GOAL_ADAPTER = TypeAdapter(TaskGoal)
+
+# 允许使用的工具集合，可根据需要逐步扩展
+_ALLOWED_ACTIONS = [
+    "navigate_to",
+    "click_element",
+    "type_text",
+    "scroll",
+    "wait",
+    "extract_data",
+    "get_element_attribute",
+    "open_notepad",
+    "take_screenshot",
+    "click_nth",
+    "find_link_by_text",
+    "download_page",
+    "download_link",
+    # 系统操作工具
+    "create_directory",
+    "delete_file_or_directory",
+    "list_directory",
+    "read_file_content",
+    "write_file_content",
+    # Office 文档工具
+    "create_word_document",
+    "create_excel_document",
+    "create_powerpoint_document",
+    "create_office_document",
+    # OCR 工具
+    "extract_text_from_image",
+    "extract_text_from_screenshot",
+    "analyze_ocr_text",
+]
+
+
+def _build_banner() -> Group:
+    """构造精美的启动横幅。"""
     banner_text = """
 ╔══════════════════════════════════════════════════════════════╗
 ║                                                              ║
@@ -76,9 +111,7 @@ def _print_banner() -> None:
 ║                                                              ║
 ╚══════════════════════════════════════════════════════════════╝
 """
-    
-    console.print(banner_text, style="bold cyan")
-    
+
     info_panel = Panel(
         "[bold green]✨ 与 AI 对话，下达自动化浏览任务[/bold green]\n"
         "[dim]支持浏览器操作、文件管理、Office 文档创建等功能[/dim]\n"
@@ -87,12 +120,11 @@ def _print_banner() -> None:
         box=box.ROUNDED,
         padding=(1, 2),
     )
-    console.print(info_panel)
-    console.print()
+    return Group(Text.from_markup(banner_text, style="bold cyan"), info_panel, "")
 
 
-def _print_env_status() -> None:
-    """展示精美的环境配置状态面板。"""
+def _build_env_status() -> Layout:
+    """构造精美的环境配置状态面板。"""
     llm_key = os.getenv("LLM_API_KEY")
     model_name = os.getenv("LLM_MODEL_NAME", "deepseek-chat")
     api_url = os.getenv("LLM_API_URL", "https://api.deepseek.com/v1/chat/completions")
@@ -145,51 +177,20 @@ def _print_env_status() -> None:
     else:
         layout["warning"].update("")
 
-    console.print(layout)
-    console.print()
+    return layout
 
 
 def _create_task_goal(description: str) -> TaskGoal:
     """根据用户自然语言描述构造一个 TaskGoal。"""
-    task_uuid = f"TASK-{str(uuid.uuid4())[:8]}"
-    return TaskGoal(
-        task_uuid=task_uuid,
-        step_id="INIT",
-        target_description=description,
-        priority_level=5,
-        max_execution_time_seconds=180,
-        # 允许使用的工具集合，可根据需要逐步扩展
-        allowed_actions=[
-            "navigate_to",
-            "click_element",
-            "type_text",
-            "scroll",
-            "wait",
-            "extract_data",
-            "get_element_attribute",
-            "open_notepad",
-            "take_screenshot",
-            "click_nth",
-            "find_link_by_text",
-            "download_page",
-            "download_link",
-            # 系统操作工具
-            "create_directory",
-            "delete_file_or_directory",
-            "list_directory",
-            "read_file_content",
-            "write_file_content",
-            # Office 文档工具
-            "create_word_document",
-            "create_excel_document",
-            "create_powerpoint_document",
-            "create_office_document",
-            # OCR 工具
-            "extract_text_from_image",
-            "extract_text_from_screenshot",
-            "analyze_ocr_text",
-        ],
-    )
+    payload = {
+        "task_uuid": f"TASK-{str(uuid.uuid4())[:8]}",
+        "step_id": "INIT",
+        "target_description": description,
+        "priority_level": 5,
+        "max_execution_time_seconds": 180,
+        "allowed_actions": _ALLOWED_ACTIONS,
+    }
+    return _TASK_GOAL_ADAPTER.validate_python(payload)
 
 
 def _confirm_dangerous_operation(tool_name: str, reason: str) -> bool:
@@ -263,16 +264,17 @@ def _run_single_task(description: str, headless: bool) -> None:
 
 def main() -> None:
     """Rich 驱动的交互式命令行主函数。"""
-    # 1. 加载环境变量
+    # 1. 加载环境变量，并配置运行日志（BrowserService 等模块只记录，不设置处理器）
     load_dotenv()
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(message)s",
+        stream=sys.stdout,
+    )
+    if os.getenv("BROWSER_DEBUG", "False").lower() == "true":
+        logging.getLogger("backend").setLevel(logging.DEBUG)
 
-    # 2. 界面与环境展示
-    _print_banner()
-    _print_env_status()
-
-    # 3. 询问是否使用无头浏览器（默认沿用环境变量设置）
-    env_headless = os.getenv("BROWSER_HEADLESS", "False").lower() == "true"
-    
+    # 2. 界面、环境与浏览器模式说明合并为一次输出，避免多次刷新终端
     browser_mode_panel = Panel(
         "[bold cyan]🌐 浏览器运行模式配置[/bold cyan]\n\n"
         "[dim]无头模式：浏览器在后台运行，不显示窗口（适合生产环境）[/dim]\n"
@@ -281,8 +283,10 @@ def main() -> None:
         box=box.ROUNDED,
         padding=(1, 2),
     )
-    console.print(browser_mode_panel)
-    
+    console.print(Group(_build_banner(), _build_env_status(), "", browser_mode_panel))
+
+    # 3. 询问是否使用无头浏览器（默认沿用环境变量设置）
+    env_headless = os.getenv("BROWSER_HEADLESS", "False").lower() == "true"
     headless = Confirm.ask(
         f"\n[bold cyan]是否以无头模式运行浏览器?[/bold cyan] "
         f"(当前 env 默认: {'[green]是[/green]' if env_headless else '[yellow]否[/yellow]'} )",
@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+import sys
+import time
+from pydantic import BaseModel, Field, computed_field, field_serializer, field_validator
 from typing import List, Optional, Dict, Any
-from datetime import datetime
-from enum import Enum
+from datetime import datetime, timezone
+from enum import IntEnum
 
 # --- 辅助类型定义 ---
 DynamicData = Dict[str, Any]
@@ -34,6 +36,12 @@ class DecisionAction(BaseModel):
     # 错误处理
     on_failure_action: str = Field("RE_EVALUATE", description="如果操作失败，Agent 下一步应该做什么（RE_EVALUATE, STOP_TASK, TRY_ALTERNATE）。")
 
+    @field_validator("tool_name")
+    @classmethod
+    def _intern_tool_name(cls, value: str) -> str:
+        """驻留工具名，使执行器分发时的字符串比较 / 字典查找走身份比较快路径。"""
+        return sys.intern(value)
+
 
 # --- 1. 任务目标结构体 (TaskGoal) ---
 
@@ -77,7 +85,7 @@ class ActionFeedback(BaseModel):
 class WebObservation(BaseModel):
     """当前网页环境的结构化观测结果。"""
     
-    observation_timestamp_utc: str = Field(default_factory=lambda: datetime.utcnow().isoformat(), description="本次观测的时间戳。")
+    observation_timestamp_ns: int = Field(default_factory=time.time_ns, description="本次观测的时间戳（Unix 纳秒）。")
     current_url: str
     http_status_code: int
     page_load_time_ms: int
@@ -91,17 +99,24 @@ class WebObservation(BaseModel):
     
     browser_health_status: str = "healthy"
 
+    @computed_field(description="本次观测的时间戳 (ISO 8601, UTC)，仅在序列化时格式化。")
+    @property
+    def observation_timestamp_utc(self) -> str:
+        seconds, nanos = divmod(self.observation_timestamp_ns, 1_000_000_000)
+        stamp = datetime.fromtimestamp(seconds, tz=timezone.utc).replace(microsecond=nanos // 1000, tzinfo=None)
+        return stamp.isoformat()
+
 
 # --- 4. 动态执行图节点结构体 (ExecutionNode) ---
 
-class ExecutionNodeStatus(str, Enum):
-    """节点在执行图中的状态。"""
-    PENDING = "PENDING"
-    RUNNING = "RUNNING"
-    SUCCESS = "SUCCESS"
-    FAILED = "FAILED"
-    PRUNED = "PRUNED"
-    SKIPPED = "SKIPPED"
+class ExecutionNodeStatus(IntEnum):
+    """节点在执行图中的状态。内部以整数比较，序列化时输出名称字符串（见 ExecutionNode）。"""
+    PENDING = 0
+    RUNNING = 1
+    SUCCESS = 2
+    FAILED = 3
+    PRUNED = 4
+    SKIPPED = 5
 
 class ExecutionNode(BaseModel):
     """
@@ -123,4 +138,20 @@ class ExecutionNode(BaseModel):
     
     # === [新增字段] 运行时状态/结果 ===
     last_observation: Optional[WebObservation] = Field(None, description="此节点执行完毕后的网页观测结果。")
-    resolved_output: Optional[str] = Field(None, description="从WebObservation中提取的关键结果，供后续节点使用。")
\ No newline at end of file
+    resolved_output: Optional[str] = Field(None, description="从WebObservation中提取的关键结果，供后续节点使用。")
+
+    @field_validator("current_status", mode="before")
+    @classmethod
+    def _parse_status_name(cls, value: Any) -> Any:
+        """兼容 JSON 计划 / LLM 输出中的名称字符串（如 "PENDING"）。"""
+        if isinstance(value, str):
+            try:
+                return ExecutionNodeStatus[value.strip().upper()]
+            except KeyError:
+                raise ValueError(f"invalid status {value!r}") from None
+        return value
+
+    @field_serializer("current_status")
+    def _serialize_status(self, status: ExecutionNodeStatus) -> str:
+        """序列化为名称字符串，保持与前端 / 已有 JSON 的兼容。"""
+        return status.name
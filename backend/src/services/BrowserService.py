@@ -1,14 +1,24 @@
 # 文件: backend/src/services/BrowserService.py
 
+import atexit
+import base64
+import functools
+import hashlib
 import json
+import logging
 import os
-import subprocess
+import queue
+import re
+import sys
 import tempfile
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 # 导入 Playwright 同步 API 和 TimeoutError
-from playwright.sync_api import sync_playwright, Page, TimeoutError, Error
+from playwright.sync_api import sync_playwright, Page, BrowserContext, Locator, TimeoutError, Error
 
 # 导入你现有的数据模型
 
@@ -20,6 +30,7 @@ from backend.src.data_models.decision_engine.decision_models import (
 from backend.src.tools.browser import (
     extract_search_results,
     take_screenshot,
+    wait_for_screenshot_writes,
     click_nth_match,
     find_link_by_text,
     save_current_page_html,
@@ -41,14 +52,16 @@ from backend.src.utils.path_utils import slugify, build_temp_file_path
 # 尝试导入OCR工具，如果不可用则使用占位符函数
 try:
     from backend.src.tools.image import (
+        batch_extract_text_from_images,
         extract_text_from_image,
+        extract_text_from_image_bytes,
         extract_text_from_screenshot,
         analyze_ocr_text_with_llm,
         extract_keywords_from_ocr,
         summarize_ocr_text,
     )
     # 检查 OCR 工具的实际可用性
-    from backend.src.tools.image.ocr_tool import EASYOCR_AVAILABLE, EASYOCR_ERROR
+    from backend.src.tools.image.ocr_tool import EASYOCR_AVAILABLE, EASYOCR_ERROR, prewarm_ocr_reader
     OCR_AVAILABLE = EASYOCR_AVAILABLE
     OCR_ERROR_DETAILS = EASYOCR_ERROR
 except (ImportError, OSError) as e:
@@ -94,66 +107,667 @@ else:
     except Exception:
         OCR_AVAILABLE = True  # 如果无法获取状态，假设可用
         OCR_ERROR_DETAILS = None
+
+# 登录界面检测用的常量：预编译正则，弹窗/输入框选择器合并为单个 CSS 选择器
+_LOGIN_KEYWORDS_CN = ("登录", "登入", "登陆", "账号登录", "用户登录", "会员登录", "立即登录")
+_LOGIN_KEYWORDS_EN = ("login", "sign in", "sign-in", "log in", "log-in", "authenticate")
+# 以下正则在页面内以 RegExp(pattern, 'i') 构造，关键词均不含正则特殊字符，直接以 | 拼接
+_LOGIN_TEXT_PATTERN = "|".join(_LOGIN_KEYWORDS_CN + _LOGIN_KEYWORDS_EN)
+# 弹窗中已有用户名输入框时的附加判断 / 弹窗中没有表单字段时的判断
+_LOGIN_FORM_HINT_PATTERN = "登录|login|sign"
+_LOGIN_MODAL_HINT_PATTERN = "|".join(_LOGIN_KEYWORDS_CN + ("login", "sign in"))
+_LOGIN_MODAL_SELECTOR = ", ".join([
+    "[role='dialog']",
+    ".modal",
+    ".modal-dialog",
+    ".popup",
+    ".popup-dialog",
+    ".dialog",
+    "[class*='modal']",
+    "[class*='popup']",
+    "[class*='dialog']",
+    "[id*='modal']",
+    "[id*='popup']",
+    "[id*='dialog']",
+    "[id*='login']",
+    "[class*='login']",
+])
+# 合并查询后最多检查的弹窗数量
+_LOGIN_MODAL_MAX_CANDIDATES = 20
+# 等待登录界面出现时使用：密码框或任一弹窗候选变为可见即结束等待
+_LOGIN_APPEAR_SELECTOR = "input[type='password'], " + _LOGIN_MODAL_SELECTOR
+_USERNAME_INPUT_SELECTOR = ", ".join([
+    "input[type='text']",
+    "input[type='email']",
+    "input[name*='user']",
+    "input[name*='account']",
+    "input[name*='login']",
+    "input[placeholder*='user']",
+    "input[placeholder*='account']",
+])
+
+# 密码框检测、弹窗枚举、可见性判断、文本匹配与表单字段检测全部在页面内完成，一次往返返回 [是否命中, 描述]
+_LOGIN_DETECTION_JS = """
+(opts) => {
+    // 页面上任意密码输入框（包括弹窗中）
+    if (document.querySelector("input[type='password']")) {
+        return [true, 'Password input field detected'];
+    }
+
+    const loginText = new RegExp(opts.textPattern, 'i');
+    const formHint = new RegExp(opts.formHintPattern, 'i');
+    const modalHint = new RegExp(opts.modalHintPattern, 'i');
+    // 同步判断可见性：先用 display:none 祖先会清空的 getClientRects 快速排除，
+    // 再用原生 checkVisibility（不支持时回退到 getComputedStyle）检查 visibility
+    const styleVisible = typeof Element.prototype.checkVisibility === 'function'
+        ? (el) => el.checkVisibility({ visibilityProperty: true })
+        : (el) => window.getComputedStyle(el).visibility !== 'hidden';
+    const isVisible = (el) => {
+        if (el.getClientRects().length === 0) return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && styleVisible(el);
+    };
+
+    const modals = document.querySelectorAll(opts.modalSelector);
+    for (let i = 0; i < modals.length && i < opts.maxModals; i++) {
+        const modal = modals[i];
+        if (!isVisible(modal)) continue;
+        const text = modal.innerText || '';
+        if (!loginText.test(text)) continue;
+        // 密码框已在上面整体检测过，这里只需检查用户名类输入框
+        if (modal.querySelector(opts.usernameSelector) && formHint.test(text)) {
+            return [true, 'Login modal/popup detected (contains login keywords and form fields)'];
+        }
+        if (modalHint.test(text)) {
+            return [true, 'Login modal/popup detected (contains login keywords)'];
+        }
+    }
+    return [false, ''];
+}
+"""
+_LOGIN_DETECTION_ARGS = {
+    "modalSelector": _LOGIN_MODAL_SELECTOR,
+    "maxModals": _LOGIN_MODAL_MAX_CANDIDATES,
+    "usernameSelector": _USERNAME_INPUT_SELECTOR,
+    "textPattern": _LOGIN_TEXT_PATTERN,
+    "formHintPattern": _LOGIN_FORM_HINT_PATTERN,
+    "modalHintPattern": _LOGIN_MODAL_HINT_PATTERN,
+}
+# 参数固定，预先拼成可直接交给 CDP Runtime.evaluate 的表达式
+_LOGIN_DETECTION_EXPR = f"({_LOGIN_DETECTION_JS})({json.dumps(_LOGIN_DETECTION_ARGS)})"
+
+# orjson 可选：可用时用于序列化工具结果，否则回退到标准库 json
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+    def _dumps_indented(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def _dumps(obj: Any) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
+    def _dumps_indented(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+
+# zstandard 可选：BROWSER_COMPRESS_STRUCTURE=True 且已安装时，页面结构快照以 .json.zst 保存
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+_COMPRESS_STRUCTURE = (
+    zstandard is not None and os.getenv("BROWSER_COMPRESS_STRUCTURE", "False").lower() == "true"
+)
+
+
+def _write_page_structure(path: str, structure: Dict[str, Any]) -> None:
+    """后台线程中执行：页面结构 JSON 的序列化（可选 zstd 压缩）与写盘。"""
+    try:
+        data = _dumps_indented(structure)
+        if path.endswith(".zst"):
+            data = zstandard.ZstdCompressor(level=3).compress(data)
+        with open(path, "wb") as f:
+            f.write(data)
+        _logger.info("[BrowserService] Page structure captured: %s", path)
+    except Exception as e:
+        _logger.warning("[BrowserService] Failed to write page structure %s: %s", path, e)
+
+# 创建 BrowserService 时在后台线程预热 OCR 模型，避免首次 OCR 时的模型加载停顿
+_OCR_PREWARM = os.getenv("OCR_PREWARM", "False").lower() == "true"
+
+# 调试输出开关（如结果内容预览）
+_DEBUG = os.getenv("BROWSER_DEBUG", "False").lower() == "true"
+
+# 运行日志：处理器与级别由入口（cli.py / api_server.py）统一配置；%s 参数只在级别允许输出时才格式化
+_logger = logging.getLogger(__name__)
+
+# 会改变页面 DOM 的工具：执行后必须重新扫描交互元素
+_DOM_MUTATING_TOOLS = frozenset({"navigate_to", "click_element", "type_text", "scroll"})
+
+# 观测中需要附带交互元素列表的工具（会改变页面内容）；其余工具默认返回空列表，
+# 可通过 tool_args.include_elements 显式覆盖
+_ELEMENT_OBSERVING_TOOLS = _DOM_MUTATING_TOOLS | {"click_nth"}
+
+# 只读工具：成功结果可按 (页面 URL, 工具, 参数) 缓存，其余任何工具执行后都会清空缓存。
+# extract_data 不缓存：页面内容会随异步加载变化，缓存的提取结果容易过期
+_CACHEABLE_TOOLS = frozenset({"get_element_attribute", "find_link_by_text"})
+_ACTION_CACHE_MAX_ENTRIES = 100
+_ACTION_CACHE_TTL_SECONDS = 300
+
+# 非视觉任务可拦截的资源类型，以及需要完整渲染页面的视觉类工具
+# （extract_data 只在走 OCR 路径时需要，由其自身判断）
+_BLOCKABLE_RESOURCE_TYPES = frozenset({"image", "stylesheet", "font", "media"})
+_VISUAL_TOOLS = frozenset({"take_screenshot", "download_page"})
+
+# 交互元素采集与观测函数：通过 add_init_script 在每个文档加载时注册一次，
+# 之后每次观测只需发送一个很短的函数调用，避免重复传输和编译整段脚本。
+# 返回按列组织（SoA）的紧凑文本编码：[tags, ids, coords, texts, xpaths] 五个字符串，
+# tags/ids/texts/xpaths 以 TAB 分隔，coords 为扁平的整数坐标 "x_min,y_min,x_max,y_max,..."（Int32Array），
+# 避免逐元素对象在 CDP 上的 JSON 序列化开销，Python 端每列只需一次 split；xpath 也在页面内拼好。
+# HTML id 不允许包含空白，文本中的空白被折叠为空格。
+_ELEMENT_COLLECTOR_JS = """
+window.__collectElems = (maxItems) => {
+    const tagNames = [];
+    const ids = [];
+    const texts = [];
+    const xpaths = [];
+    const coords = new Int32Array(maxItems * 4);
+    const tags = ['a', 'button', 'input', 'textarea', 'select'];
+    const nodes = document.querySelectorAll(tags.join(','));
+    // 优先使用原生 checkVisibility，避免为每个元素创建 CSSStyleDeclaration
+    const styleVisible = typeof Element.prototype.checkVisibility === 'function'
+        ? (el) => el.checkVisibility({ visibilityProperty: true })
+        : (el) => window.getComputedStyle(el).visibility !== 'hidden';
+    let count = 0;
+    for (let index = 0; index < nodes.length && count < maxItems; index++) {
+        const el = nodes[index];
+        const rect = el.getBoundingClientRect();
+        const isVisible = rect.width > 0 && rect.height > 0 && styleVisible(el);
+        
+        if (isVisible) {
+            const tagName = el.tagName.toLowerCase();
+            tagNames.push(tagName);
+            ids.push(el.id || `gen_id_${index}`);
+            // 生成的 id 在页面中并不存在，只能按标签定位
+            xpaths.push(el.id ? `//${tagName}[@id='${el.id}']` : `//${tagName}`);
+            texts.push(((el.innerText || '').slice(0, 50) || el.value || '').replace(/\\s+/g, ' '));
+            coords.set([rect.left, rect.top, rect.right, rect.bottom], count * 4);
+            count++;
+        }
+    }
+    return [
+        tagNames.join('\\t'), ids.join('\\t'), coords.subarray(0, count * 4).join(','),
+        texts.join('\\t'), xpaths.join('\\t'),
+    ];
+};
+
+// 一次往返完成观测，返回 [DOM 指纹, 主文档状态码, 元素列数据]。
+// 廉价的 DOM 指纹：元素数量 + 标签直方图 + 少量文本样本 + 滚动位置；与上一次相同时不重新采集（列数据为 null）。
+// 状态码来自 Navigation Timing Level 2，只在主框架导航后请求，不可用时为 0。
+window.__observe = (maxItems, lastFingerprint, wantStatus) => {
+    const els = document.querySelectorAll('a,button,input,textarea,select');
+    const tags = {};
+    els.forEach(el => { tags[el.tagName] = (tags[el.tagName] || 0) + 1; });
+    const sample = Array.from(els).slice(0, 20)
+        .map(el => el.getAttribute('aria-label') || (el.textContent || '').trim().slice(0, 20))
+        .join('|');
+    const fingerprint = JSON.stringify([location.href, els.length, tags, sample, Math.floor(window.scrollY / 100)]);
+    let status = 0;
+    if (wantStatus) {
+        const nav = performance.getEntriesByType('navigation')[0];
+        status = (nav && nav.responseStatus) || 0;
+    }
+    const columns = fingerprint === lastFingerprint ? null : window.__collectElems(maxItems);
+    return [fingerprint, status, columns];
+};
+"""
+
+_CALL_OBSERVER_JS = (
+    "([maxItems, lastFingerprint, wantStatus]) => "
+    "(window.__observe ? window.__observe(maxItems, lastFingerprint, wantStatus) : null)"
+)
+
+# scroll 工具：默认一屏的上下滚动脚本，以及按像素滚动的参数化脚本
+_SCROLL_PAGE_JS = {
+    1: "window.scrollBy(0, window.innerHeight)",
+    -1: "window.scrollBy(0, -window.innerHeight)",
+}
+_SCROLL_BY_JS = "(dy) => window.scrollBy(0, dy)"
+
+# click_element 点击后观察是否发生跳转的时间窗口
+_CLICK_NAVIGATION_WAIT_MS = 500
+
+_PAGE_LOADED_JS = "() => document.readyState === 'complete'"
+# wait 工具的稳定条件：加载完成，且没有声明 aria-busy 的区域（正在加载的动态内容）
+_PAGE_SETTLED_JS = "() => document.readyState === 'complete' && !document.querySelector('[aria-busy=\"true\"]')"
+
+# 主文档的 HTTP 状态码（Navigation Timing Level 2），不可用时返回 0
+_MAIN_DOCUMENT_STATUS_JS = """
+() => {
+    const nav = performance.getEntriesByType('navigation')[0];
+    return (nav && nav.responseStatus) || 0;
+}
+"""
+
+# 供 LLM 分析的精简 HTML：在页面内选取主体区域（main/article 等，需包含正文的大部分文本，否则取 body），
+# 去掉 script/style/svg 等噪声节点以及 class/style/data-*/事件等只影响展示的属性后截断，
+# 截断预算全部留给内容，只把需要的部分传回 Python。
+_TRUNCATED_HTML_JS = """
+(maxLength) => {
+    const body = document.body || document.documentElement;
+    const bodyTextLength = (body.innerText || '').length;
+    let root = body;
+    for (const candidate of document.querySelectorAll('main, article, [role="main"], #content')) {
+        if ((candidate.innerText || '').length >= bodyTextLength * 0.5) {
+            root = candidate;
+            break;
+        }
+    }
+    const clone = root.cloneNode(true);
+    clone.querySelectorAll('script, style, noscript, svg, template, link, meta').forEach(node => node.remove());
+    const noisyAttr = /^(class|style|data-|on|aria-)/;
+    for (const el of [clone, ...clone.querySelectorAll('*')]) {
+        for (const name of el.getAttributeNames()) {
+            if (noisyAttr.test(name)) el.removeAttribute(name);
+        }
+    }
+    return clone.outerHTML.slice(0, maxLength);
+}
+"""
+
+# 页面结构快照：一次 getElementsByTagName('*') 遍历把节点分到 headings/links/forms 桶中，
+# label[for] 预先建成 id -> 文本的 Map，表单控件通过 form.elements 读取，不再逐个 querySelector。
+# 各桶在遍历中直接限量，全部装满或访问节点数达到预算时提前结束遍历。
+_PAGE_STRUCTURE_JS = """
+() => {
+    const MAX_HEADINGS = 100, MAX_LINKS = 120, MAX_FORMS = 30, MAX_NODES = 20000;
+    const cleanText = (t) => (t || "").replace(/\\s+/g, " ").trim();
+    const labelById = new Map();
+    for (const label of document.getElementsByTagName("label")) {
+        const target = label.getAttribute("for");
+        // 与 querySelector 一致：同一 id 取文档顺序中的第一个 label
+        if (target && !labelById.has(target)) {
+            labelById.set(target, cleanText(label.innerText || label.textContent || ""));
+        }
+    }
+    const headings = [];
+    const links = [];
+    const forms = [];
+    const nodes = document.getElementsByTagName("*");
+    const nodeCount = Math.min(nodes.length, MAX_NODES);
+    for (let i = 0; i < nodeCount; i++) {
+        const el = nodes[i];
+        switch (el.tagName) {
+            case "H1":
+            case "H2":
+            case "H3":
+                if (headings.length < MAX_HEADINGS) {
+                    headings.push({ tag: el.tagName, text: cleanText(el.innerText || el.textContent || "") });
+                }
+                break;
+            case "A":
+                if (links.length < MAX_LINKS && el.hasAttribute("href")) {
+                    links.push({
+                        text: cleanText(el.innerText || el.textContent || ""),
+                        href: el.getAttribute("href") || "",
+                    });
+                }
+                break;
+            case "FORM": {
+                if (forms.length >= MAX_FORMS) break;
+                const inputs = [];
+                for (const input of el.elements) {
+                    if (inputs.length >= 50) break;
+                    if (input.tagName !== "INPUT" && input.tagName !== "TEXTAREA" && input.tagName !== "SELECT") continue;
+                    const id = input.getAttribute("id");
+                    inputs.push({
+                        tag: input.tagName,
+                        type: input.getAttribute("type") || "text",
+                        name: input.getAttribute("name") || "",
+                        placeholder: input.getAttribute("placeholder") || "",
+                        label: (id && labelById.get(id)) || "",
+                    });
+                }
+                forms.push({
+                    action: el.getAttribute("action") || "",
+                    method: (el.getAttribute("method") || "GET").toUpperCase(),
+                    inputs,
+                });
+                break;
+            }
+        }
+        if (headings.length >= MAX_HEADINGS && links.length >= MAX_LINKS && forms.length >= MAX_FORMS) break;
+    }
+    const sections = Array.from(document.body.children).slice(0, 30).map(el => ({
+        tag: el.tagName,
+        id: el.getAttribute("id") || "",
+        class: cleanText(el.getAttribute("class") || ""),
+        text_sample: cleanText((el.innerText || el.textContent || "").slice(0, 200)),
+    }));
+    return {
+        url: window.location.href,
+        title: document.title,
+        headings,
+        links,
+        forms,
+        sections,
+        timestamp: new Date().toISOString(),
+    };
+}
+"""
+
+# extract_data 的默认 LLM 提取指令（调用方未提供 extraction_instruction 时使用）
+_PROMPT_BLOG_FROM_OCR = (
+    "请从以上OCR识别的文本中提取博客/文章内容，包括："
+    "1. 文章标题（title）- 如果有的话"
+    "2. 正文内容（content）- 完整的文章正文文本，这是最重要的"
+    "3. 作者信息（author，如果存在）"
+    "4. 发布时间（publish_time，如果存在）"
+    "忽略导航栏、页脚、广告、评论区等无关内容，只提取文章的核心正文内容。"
+    "返回JSON格式：{\"title\": \"标题\", \"content\": \"正文内容\", \"author\": \"作者\", \"publish_time\": \"时间\"}"
+)
+_PROMPT_LINKS_FROM_OCR = (
+    "请从以上OCR识别的文本中提取所有可以跳转的URL链接，"
+    "格式为标题和URL的对应关系。"
+    "忽略导航栏、页脚、广告等无关链接。"
+)
+_PROMPT_BLOG_FROM_HTML = (
+    "提取当前页面的博客/文章正文内容，包括："
+    "1. 文章标题（title）"
+    "2. 正文内容（content）- 完整的文章正文文本"
+    "3. 作者信息（author，如果存在）"
+    "4. 发布时间（publish_time，如果存在）"
+    "忽略导航栏、页脚、广告、评论区等无关内容，只提取文章的核心正文内容。"
+    "返回格式应为JSON，包含title、content、author、publish_time字段。"
+)
+_PROMPT_BOTH_FROM_HTML = (
+    "提取页面中的以下信息："
+    "1. 所有可以跳转的 URL 链接（格式为标题和 URL 的对应关系）"
+    "2. 如果当前页面是博客/文章页面，提取文章正文内容（包括标题、正文、作者、发布时间）"
+    "忽略导航栏、页脚、广告等无关内容，重点关注主要内容区域。"
+)
+_PROMPT_LINKS_FROM_HTML = (
+    "提取页面中所有可以跳转的 URL 链接，格式为标题和 URL 的对应关系。"
+    "忽略导航栏、页脚、广告等无关链接，重点关注主要内容区域的链接。"
+    "包括搜索结果、文章链接、产品链接等所有可点击的链接。"
+)
+_PROMPT_BLOG_FROM_HTML_BRIEF = (
+    "提取当前页面的博客/文章正文内容，包括标题、正文、作者、发布时间。"
+    "返回JSON格式，包含title、content、author、publish_time字段。"
+)
+
+# OCR 用截图的 JPEG 质量：文字识别对该质量下的压缩不敏感，文件体积远小于 PNG
+_OCR_SCREENSHOT_QUALITY = 85
+# OCR 用整页截图的最大高度（像素），超长页面只截取顶部；可通过 max_screenshot_height_px 覆盖，0 表示不限制
+_OCR_MAX_SCREENSHOT_HEIGHT = 4096
+# 元素截图的超时（毫秒）：元素不可见或不稳定时尽快回退到整页截图，而不是耗满动作超时
+_OCR_ELEMENT_SCREENSHOT_TIMEOUT_MS = 2000
+_DOCUMENT_SIZE_JS = "() => [document.documentElement.scrollWidth, document.documentElement.scrollHeight]"
+
+# extract_data 默认走 OCR；页面文本充足、图片面积占比低且没有 canvas 的 HTML 页面，
+# DOM 文本已经完整，直接走 HTML 提取，省去整页截图与 OCR
+_OCR_SKIP_MIN_TEXT_LENGTH = 2000
+_OCR_SKIP_MAX_IMAGE_RATIO = 0.3
+_TEXT_RICH_PAGE_JS = """
+([minTextLength, maxImageRatio]) => {
+    const body = document.body;
+    if (!body || document.contentType !== 'text/html' || document.querySelector('canvas')) return false;
+    if ((body.innerText || '').length <= minTextLength) return false;
+    const root = document.documentElement;
+    const pageArea = Math.max(root.scrollWidth * root.scrollHeight, 1);
+    let imageArea = 0;
+    for (const img of document.images) imageArea += img.clientWidth * img.clientHeight;
+    return imageArea / pageArea < maxImageRatio;
+}
+"""
+
+# 每个文档加载时通过 add_init_script 注册的全部页面函数：元素采集/观测 + 结构快照，
+# 之后只需发送很短的调用表达式，不再逐次传输和编译整段脚本
+_AGENT_INIT_SCRIPT = _ELEMENT_COLLECTOR_JS + "\nwindow.__captureStructure = " + _PAGE_STRUCTURE_JS.strip() + ";\n"
+_CALL_STRUCTURE_EXPR = "window.__captureStructure ? window.__captureStructure() : null"
+_CALL_STRUCTURE_JS = f"() => ({_CALL_STRUCTURE_EXPR})"
+
+# 批量执行 pre_actions：连续的 scroll/wait 在页面内一次完成，返回每一步的错误信息（成功为 null）。
+# click 不在此批量执行：原生 element.click() 跳过可操作性检查且不是可信事件，导航型点击还会中断 evaluate。
+_PRE_ACTIONS_JS = """
+async (steps) => {
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const errors = [];
+    for (const step of steps) {
+        try {
+            if (step.type === 'scroll') {
+                window.scrollBy(0, step.amount);
+            } else if (step.type === 'wait') {
+                await sleep(step.duration * 1000);
+            }
+            errors.push(null);
+        } catch (e) {
+            errors.push(String(e));
+        }
+    }
+    return errors;
+}
+"""
+
+# 参与选择器编译的定位参数，按 _compile_selector 的参数顺序排列，同时作为编译缓存的键
+_SELECTOR_ARG_KEYS = ("xpath", "selector", "container_selector", "relative_selector", "text_content", "tag_hint")
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_selector(xpath, selector, container, relative, text, tag_hint) -> Optional[str]:
+    """按 _get_selector 的优先级把定位参数编译为 Playwright 选择器；无可用参数时返回 None。"""
+    # 1. 精确 XPath
+    if xpath:
+        return f"xpath={xpath}"
+
+    # 2. CSS Selector (标准定位)
+    if selector:
+        return selector
+
+    # 3. 父子组合定位 (Container + Relative)
+    if container:
+        # 使用 Playwright 的复合定位语法: "父定位器 >> 子定位器"
+        if not relative:
+            return container
+        return f"{container} >> {relative}"
+
+    # 4. 基于文本内容的智能定位 (兼容旧格式)
+    if text:
+        if tag_hint:
+            return f"{tag_hint}:has-text('{text}')"
+        return f"*:has-text('{text}')"
+
+    return None
+
+
+# 每个 (线程, headless) 组合最多保留的预热上下文数量
+MAX_CHROME_WORKERS = int(os.getenv("BROWSER_POOL_SIZE", "20"))
+# 浏览器启动后立即预热的上下文数量（各带一个空白页），后续 BrowserService 直接取用
+PREWARM_CONTEXTS = int(os.getenv("BROWSER_PREWARM_CONTEXTS", "0"))
+
+_BROWSER_LAUNCH_ARGS = ['--disable-features=TranslateUI', '--no-sandbox']
+# 设置后不再启动本地 Chromium，而是通过 CDP 连接到已运行的浏览器（如 http://localhost:9222），
+# 多个 Agent 进程共享同一个浏览器进程，各自使用独立的上下文
+_CDP_ENDPOINT = os.getenv("BROWSER_CDP_ENDPOINT") or None
+_CONTEXT_OPTIONS = {
+    "viewport": {'width': 1920, 'height': 1080},
+    "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36",
+}
+
+
+class _BrowserPool:
+    """
+    进程级的浏览器上下文池：复用已启动的 Playwright/Chromium 和预热的 BrowserContext，
+    避免每个 BrowserService 都冷启动一次浏览器。
+    Playwright 同步 API 的对象只能在创建它的线程中使用，因此每个线程只启动一个
+    Playwright 驱动进程（有头/无头浏览器共用），浏览器按 (线程, headless) 分别维护。
+    指定 cdp_endpoint 时改为连接外部浏览器，headless 参数由外部浏览器决定。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = MAX_CHROME_WORKERS,
+        cdp_endpoint: Optional[str] = _CDP_ENDPOINT,
+        prewarm: int = PREWARM_CONTEXTS,
+    ):
+        self._maxsize = maxsize
+        self._prewarm = min(prewarm, maxsize)
+        self._cdp_endpoint = cdp_endpoint
+        self._lock = threading.Lock()
+        # thread_id -> Playwright 驱动
+        self._drivers: Dict[int, Any] = {}
+        # (thread_id, headless) -> {"browser", "idle": queue.Queue[BrowserContext]}
+        self._entries: Dict[Tuple[int, bool], Dict[str, Any]] = {}
+
+    def _driver(self) -> Any:
+        """返回当前线程的 Playwright 驱动，不存在时启动。"""
+        ident = threading.get_ident()
+        with self._lock:
+            playwright = self._drivers.get(ident)
+        if playwright is None:
+            playwright = sync_playwright().start()
+            with self._lock:
+                self._drivers[ident] = playwright
+        return playwright
+
+    def _entry(self, headless: bool) -> Dict[str, Any]:
+        """
+        返回当前线程的浏览器条目，不存在或已断开时启动。
+        驱动与浏览器按线程划分，只有所属线程会创建自己的那一份，因此冷启动（数秒）不持有 _lock，
+        只在读取和发布条目时加锁，避免阻塞其他线程的 acquire/shutdown。
+        """
+        key = (threading.get_ident(), headless)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry["browser"].is_connected():
+            return entry
+        playwright = self._driver()
+        if self._cdp_endpoint:
+            browser = playwright.chromium.connect_over_cdp(self._cdp_endpoint)
+        else:
+            # 启动 Chromium，增加参数避免翻译弹窗等干扰，并使用 --no-sandbox
+            browser = playwright.chromium.launch(headless=headless, args=_BROWSER_LAUNCH_ARGS)
+        entry = {"browser": browser, "idle": queue.Queue(maxsize=self._maxsize)}
+        for _ in range(self._prewarm):
+            entry["idle"].put_nowait(self._prewarmed_context(browser))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def _new_context(browser, storage_state: Optional[str] = None) -> BrowserContext:
+        """新建上下文并注册页面函数脚本。"""
+        context = browser.new_context(storage_state=storage_state, **_CONTEXT_OPTIONS)
+        context.add_init_script(script=_AGENT_INIT_SCRIPT)
+        return context
+
+    @classmethod
+    def _prewarmed_context(cls, browser) -> BrowserContext:
+        """新建一个带空白页的上下文，供 acquire 直接取用。"""
+        context = cls._new_context(browser)
+        context.new_page()
+        return context
+
+    def acquire(self, headless: bool, storage_state: Optional[str] = None) -> BrowserContext:
+        """
+        取出一个空闲上下文；没有空闲时新建一个。
+        指定 storage_state（已保存的登录态文件）时总是新建上下文并加载该状态；
+        这类上下文带有登录态，使用方应直接关闭而不是交还给池。
+        """
+        entry = self._entry(headless)
+        if not storage_state:
+            try:
+                return entry["idle"].get_nowait()
+            except queue.Empty:
+                pass
+        return self._new_context(entry["browser"], storage_state)
+
+    def launch_persistent(self, user_data_dir: str, headless: bool) -> BrowserContext:
+        """
+        以磁盘上的 Chromium 用户数据目录启动持久化上下文（Cookie、缓存、IndexedDB 等直接复用）。
+        持久化上下文独占该目录和一个浏览器进程，不进入池，使用完毕后由调用方关闭。
+        """
+        playwright = self._driver()
+        os.makedirs(user_data_dir, exist_ok=True)
+        context = playwright.chromium.launch_persistent_context(
+            user_data_dir, headless=headless, args=_BROWSER_LAUNCH_ARGS, **_CONTEXT_OPTIONS
+        )
+        context.add_init_script(script=_AGENT_INIT_SCRIPT)
+        return context
+
+    def release(self, context: BrowserContext, headless: bool) -> None:
+        """
+        关闭用过的上下文，并按预热数量补充一个全新的上下文。
+        用过的上下文不再放回池中：localStorage、sessionStorage、IndexedDB、权限和
+        Service Worker 缓存无法在上下文级别可靠清空，复用会把上一个任务的状态带给下一个任务。
+        """
+        try:
+            context.close()
+        except Exception:
+            pass
+        with self._lock:
+            entry = self._entries.get((threading.get_ident(), headless))
+        if entry is None or not entry["browser"].is_connected() or entry["idle"].qsize() >= self._prewarm:
+            return
+        try:
+            entry["idle"].put_nowait(self._prewarmed_context(entry["browser"]))
+        except Exception:
+            pass
+
+    def shutdown(self) -> None:
+        """
+        关闭当前线程持有的浏览器和 Playwright 实例（外部 CDP 浏览器只断开连接，不会被关闭）。
+        同步 API 的对象不能跨线程操作，atexit 只能清理主线程的浏览器；
+        其他使用 BrowserService 的工作线程必须在退出前调用 shutdown_browser_pool()。
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            keys = [key for key in self._entries if key[0] == ident]
+            entries = [self._entries.pop(key) for key in keys]
+            playwright = self._drivers.pop(ident, None)
+        for entry in entries:
+            try:
+                entry["browser"].close()
+            except Exception:
+                pass
+        if playwright is not None:
+            try:
+                playwright.stop()
+            except Exception:
+                pass
+
+
+_pool = _BrowserPool()
+atexit.register(_pool.shutdown)
+
+
+def shutdown_browser_pool() -> None:
+    """关闭当前线程在浏览器池中的浏览器和 Playwright 驱动；工作线程结束前调用。"""
+    _pool.shutdown()
+
+
 class BrowserService:
     def _capture_page_structure(self, task_topic: str = "page_structure") -> Optional[str]:
         """
         捕获当前页面的结构信息，保存为 JSON，便于后续回溯页面状态。
         只保留关键信息并限制数量，防止文件过大。
+        序列化与写盘在后台线程完成，返回的路径在 close() 之后保证已写入。
         """
         try:
-            structure = self.page.evaluate(
-                """() => {
-                    const limitList = (arr, limit = 100) => arr.slice(0, limit);
-                    const cleanText = (t) => (t || "").replace(/\\s+/g, " ").trim();
-                    const headings = Array.from(document.querySelectorAll("h1, h2, h3")).map(el => ({
-                        tag: el.tagName,
-                        text: cleanText(el.innerText || el.textContent || ""),
-                    }));
-                    const links = limitList(Array.from(document.querySelectorAll("a[href]")).map(el => ({
-                        text: cleanText(el.innerText || el.textContent || ""),
-                        href: el.getAttribute("href") || "",
-                    })), 120);
-                    const forms = limitList(Array.from(document.querySelectorAll("form")).map(form => ({
-                        action: form.getAttribute("action") || "",
-                        method: (form.getAttribute("method") || "GET").toUpperCase(),
-                        inputs: limitList(Array.from(form.querySelectorAll("input, textarea, select")).map(input => ({
-                            tag: input.tagName,
-                            type: input.getAttribute("type") || "text",
-                            name: input.getAttribute("name") || "",
-                            placeholder: input.getAttribute("placeholder") || "",
-                            label: (() => {
-                                const id = input.getAttribute("id");
-                                if (!id) return "";
-                                const label = document.querySelector(`label[for='${id}']`);
-                                return label ? cleanText(label.innerText || label.textContent || "") : "";
-                            })(),
-                        })), 50),
-                    })), 30);
-                    const sections = limitList(Array.from(document.body.children).map(el => ({
-                        tag: el.tagName,
-                        id: el.getAttribute("id") || "",
-                        class: cleanText(el.getAttribute("class") || ""),
-                        text_sample: cleanText((el.innerText || el.textContent || "").slice(0, 200)),
-                    })), 30);
-                    return {
-                        url: window.location.href,
-                        title: document.title,
-                        headings,
-                        links,
-                        forms,
-                        sections,
-                        timestamp: new Date().toISOString(),
-                    };
-                }"""
+            structure = self._evaluate_hot(_CALL_STRUCTURE_EXPR, _CALL_STRUCTURE_JS)
+            if structure is None:
+                # 当前文档早于 init script 加载，直接执行完整脚本
+                structure = self.page.evaluate(_PAGE_STRUCTURE_JS)
+            path = build_temp_file_path(
+                "other", task_topic or "page_structure", ".json.zst" if _COMPRESS_STRUCTURE else ".json"
             )
-            path = build_temp_file_path("other", task_topic or "page_structure", ".json")
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, "w", encoding="utf-8") as f:
-                json.dump(structure, f, ensure_ascii=False, indent=2)
-            print(f"[BrowserService] Page structure captured: {path}")
+            self._ensure_dir(os.path.dirname(path))
+            self._io_pool.submit(_write_page_structure, path, structure)
             return path
         except Exception as e:
-            print(f"[BrowserService] Failed to capture page structure: {e}")
+            _logger.warning("[BrowserService] Failed to capture page structure: %s", e)
             return None
 
     """
@@ -161,30 +775,183 @@ class BrowserService:
     职责：执行 DecisionAction，并返回标准化的 WebObservation。
     """
 
-    def __init__(self, headless: bool = True):
-        self.playwright = sync_playwright().start()
-        # 启动 Chromium，增加参数避免翻译弹窗等干扰，并使用 --no-sandbox
-        self.browser = self.playwright.chromium.launch(headless=headless, args=['--disable-features=TranslateUI', '--no-sandbox'])
-        self.context = self.browser.new_context(
-            viewport={'width': 1920, 'height': 1080},
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36"
+    # URL 中的登录关键词（login / signin / sign-in / log-in / auth / authenticate）
+    _LOGIN_URL_RE = re.compile(r"login|log-in|signin|sign-in|auth", re.IGNORECASE)
+
+    def __init__(
+        self,
+        headless: bool = True,
+        storage_state_path: Optional[str] = None,
+        user_data_dir: Optional[str] = None,
+    ):
+        # 登录态持久化文件：人工登录完成后保存，下次启动时加载，避免重复登录
+        self._storage_state_path = storage_state_path or os.getenv("BROWSER_STORAGE_STATE") or None
+        storage_state = (
+            self._storage_state_path
+            if self._storage_state_path and os.path.exists(self._storage_state_path)
+            else None
         )
-        self.page: Page = self.context.new_page()
+        # 指定 Chromium 用户数据目录时使用持久化上下文，直接复用磁盘上的登录态与 HTTP 缓存
+        self._user_data_dir = user_data_dir or os.getenv("BROWSER_USER_DATA_DIR") or None
+        if self._user_data_dir:
+            self.context: BrowserContext = _pool.launch_persistent(self._user_data_dir, headless)
+            # 持久化上下文启动时自带一个空白页
+            self.page: Page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        else:
+            # 从进程级上下文池中取出预热的 BrowserContext，避免冷启动 Chromium
+            self.context = _pool.acquire(headless, storage_state=storage_state)
+            # 预热的上下文自带一个空白页，直接使用
+            self.page = self.context.pages[0] if self.context.pages else self.context.new_page()
+        # 持久化上下文没有独立的 Browser 对象，此时为 None
+        self.browser = self.context.browser
         self._last_http_status = 200
+        # 主框架发生导航后置位，构造观测时再按需读取一次状态码
+        self._http_status_stale = False
         self._headless = headless
         self._login_prompt_shown = False
+        # 交互元素缓存：DOM 指纹未变化时直接复用上一次的扫描结果
+        self._last_dom_fingerprint: Optional[str] = None
+        self._cached_elements: List[KeyElement] = []
+        # 单次观测返回的交互元素上限
+        self._max_elements = int(os.getenv("BROWSER_MAX_ELEMENTS", "40"))
+        # 只读工具的结果缓存（LRU + TTL）：key -> (写入时间, ActionFeedback)
+        self._action_cache: "OrderedDict[str, Tuple[float, ActionFeedback]]" = OrderedDict()
+        # selector -> Locator 缓存，导航时清空
+        self._locator_cache: Dict[str, Locator] = {}
+        # 记事本目标路径解析结果与已创建的目录（_ensure_dir），避免重复的 abspath/makedirs 系统调用
+        self._resolved_paths: Dict[str, str] = {}
+        self._ensured_dirs: set = set()
+        # 已确认不是登录界面的 URL；主框架导航或页面变更类操作后清空
+        self._login_cache: Dict[str, Tuple[bool, str]] = {}
+        # 上一次 take_screenshot 的 (SHA-256, 文件路径)，主框架导航后清空
+        self._last_screenshot: Optional[Tuple[bytes, str]] = None
+        # 截图 burst 模式：视口与 full_page 参数未变时直接发送 Page.captureScreenshot，
+        # 省去 Playwright 每次截图前的设备参数/背景色等准备调用；主框架导航后重置
+        self._burst_state: Optional[Tuple[int, int, bool]] = None
+        # 后台 I/O 线程：页面结构快照写盘、与页面操作并行的 LLM 请求；close() 时等待全部完成
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="browser-io")
+        # 常驻 CDP 会话：burst 截图与高频脚本（登录检测、DOM 指纹、元素采集）共用，失败时重建
+        self._cdp_session = None
+        # 资源拦截：navigate_to 的 block_resources 参数（默认取 BROWSER_BLOCK_RESOURCES）控制
+        self._block_resources_default = os.getenv("BROWSER_BLOCK_RESOURCES", "False").lower() == "true"
+        self._blocking_resources = False
+
+        if OCR_AVAILABLE and _OCR_PREWARM:
+            threading.Thread(target=prewarm_ocr_reader, name="ocr-prewarm", daemon=True).start()
+
+        # 只监听主框架导航，而不是为每个子资源响应回调一次 Python
+        self.page.on("framenavigated", self._handle_frame_navigated)
+
+        # 工具名 -> 处理方法，execute_action 通过一次字典查找分发
+        self._tool_handlers = {
+            "navigate_to": self._tool_navigate_to,
+            "type_text": self._tool_type_text,
+            "get_element_attribute": self._tool_get_element_attribute,
+            "extract_data": self._tool_extract_data,
+            "take_screenshot": self._tool_take_screenshot,
+            "download_page": self._tool_download_page,
+            "download_link": self._tool_download_link,
+            "click_nth": self._tool_click_nth,
+            "find_link_by_text": self._tool_find_link_by_text,
+            "click_element": self._tool_click_element,
+            "open_notepad": self._tool_open_notepad,
+            "scroll": self._tool_scroll,
+            "wait": self._tool_wait,
+            "extract_text_from_image": self._tool_extract_text_from_image,
+            "analyze_ocr_text": self._tool_analyze_ocr_text,
+            "extract_text_from_screenshot": self._tool_extract_text_from_screenshot,
+        }
+
+    def _handle_frame_navigated(self, frame):
+        """主框架导航后标记状态码需要刷新，并作废登录检测缓存"""
+        if frame.parent_frame is None:
+            self._http_status_stale = True
+            self._login_cache.clear()
+            self._last_screenshot = None
+            self._burst_state = None
+
+    def _current_http_status(self) -> int:
+        """返回主文档的状态码；仅在主框架导航后才向页面查询一次。"""
+        if self._http_status_stale:
+            self._http_status_stale = False
+            try:
+                status = self.page.evaluate(_MAIN_DOCUMENT_STATUS_JS)
+            except Error:
+                status = 0
+            if status:
+                self._last_http_status = int(status)
+        return self._last_http_status
+
+    def _route_handler(self, route):
+        """拦截图片/样式/字体/媒体请求，其余请求放行"""
+        if route.request.resource_type in _BLOCKABLE_RESOURCE_TYPES:
+            route.abort()
+        else:
+            route.continue_()
+
+    def _set_resource_blocking(self, enabled: bool) -> None:
+        """
+        开启或关闭资源拦截。仅在开启时注册路由，避免关闭状态下每个请求都回调 Python。
+        """
+        if enabled == self._blocking_resources:
+            return
+        if enabled:
+            self.page.route("**/*", self._route_handler)
+        else:
+            self.page.unroute("**/*", self._route_handler)
+        self._blocking_resources = enabled
+
+    def _ensure_full_render(self, timeout_ms: int) -> None:
+        """
+        视觉类操作前调用：当前页面是在资源拦截开启时加载的，缺少样式和图片，
+        仅取消拦截只影响之后的请求，因此关闭拦截后重新加载页面。
+        """
+        if not self._blocking_resources:
+            return
+        self._set_resource_blocking(False)
+        _logger.info("[BrowserService] Reloading page without resource blocking for visual tool")
+        self.page.reload(wait_until="load", timeout=timeout_ms)
 
-        self.page.on("response", self._handle_response)
+    def _get_cdp_session(self):
+        """返回当前页面的常驻 CDP 会话，不存在时创建。"""
+        if self._cdp_session is None:
+            self._cdp_session = self.context.new_cdp_session(self.page)
+        return self._cdp_session
 
-    def _handle_response(self, response):
-        """捕获主文档的状态码"""
-        if response.request.resource_type == "document":
-            self._last_http_status = response.status
+    def _evaluate_hot(self, expression: str, fallback_js: str, arg: Any = None) -> Any:
+        """
+        通过常驻 CDP 会话的 Runtime.evaluate 执行高频脚本，省去 page.evaluate 的绑定与序列化包装。
+        CDP 会话不可用时丢弃会话并退回 page.evaluate；页面脚本本身抛出的异常直接向上抛出。
+        """
+        try:
+            response = self._get_cdp_session().send(
+                "Runtime.evaluate", {"expression": expression, "returnByValue": True}
+            )
+        except Error as e:
+            _logger.warning("[BrowserService] CDP evaluate failed, falling back to page.evaluate: %s", e)
+            self._cdp_session = None
+            return self.page.evaluate(fallback_js, arg)
+        if "exceptionDetails" in response:
+            details = response["exceptionDetails"]
+            raise Error(details.get("exception", {}).get("description") or details.get("text", "Evaluation failed"))
+        return response["result"].get("value")
 
     def close(self):
-        self.context.close()
-        self.browser.close()
-        self.playwright.stop()
+        try:
+            wait_for_screenshot_writes()
+        except OSError as e:
+            _logger.error("[BrowserService] %s", e)
+        self._io_pool.shutdown(wait=True)
+        if self._user_data_dir or self._storage_state_path:
+            # 持久化上下文独占浏览器进程，关闭时一并退出并把配置写回磁盘；
+            # 加载或保存过登录态的上下文同样直接关闭，不经过池，避免登录态泄漏给其他任务
+            try:
+                self.context.close()
+            except Error:
+                pass
+            return
+        # 上下文交还给池（关闭并补充预热上下文），浏览器进程保持运行
+        _pool.release(self.context, self._headless)
 
     def _detect_login_interface(self) -> Tuple[bool, str]:
         """
@@ -194,125 +961,18 @@ class BrowserService:
         """
         try:
             # 1. 检测 URL 中的登录关键词
-            url = (self.page.url or "").lower()
-            url_keywords = ["login", "signin", "sign-in", "auth", "authenticate", "signin", "log-in"]
-            if any(keyword in url for keyword in url_keywords):
+            if self._LOGIN_URL_RE.search(self.page.url or ""):
                 return True, "URL contains login keywords"
             
-            # 2. 检测页面上的密码输入框（包括弹窗中）
-            try:
-                password_inputs = self.page.locator("input[type='password']")
-                if password_inputs.count() > 0:
-                    return True, "Password input field detected"
-            except Exception:
-                pass
-            
-            # 3. 检测弹窗/模态框中的登录相关内容
-            login_keywords_cn = ["登录", "登入", "登陆", "账号登录", "用户登录", "会员登录", "立即登录"]
-            login_keywords_en = ["login", "sign in", "sign-in", "log in", "log-in", "authenticate"]
-            all_login_keywords = login_keywords_cn + login_keywords_en
-            
-            # 常见的弹窗/模态框选择器
-            modal_selectors = [
-                "[role='dialog']",
-                ".modal",
-                ".modal-dialog",
-                ".popup",
-                ".popup-dialog",
-                ".dialog",
-                "[class*='modal']",
-                "[class*='popup']",
-                "[class*='dialog']",
-                "[id*='modal']",
-                "[id*='popup']",
-                "[id*='dialog']",
-                "[id*='login']",
-                "[class*='login']",
-            ]
-            
-            # 检测弹窗是否可见且包含登录关键词
-            for modal_selector in modal_selectors:
-                try:
-                    modals = self.page.locator(modal_selector)
-                    modal_count = modals.count()
-                    
-                    for idx in range(min(modal_count, 5)):  # 最多检查5个弹窗
-                        modal = modals.nth(idx)
-                        
-                        # 检查弹窗是否可见
-                        try:
-                            if not modal.is_visible(timeout=500):
-                                continue
-                        except Exception:
-                            continue
-                        
-                        # 获取弹窗的文本内容
-                        try:
-                            modal_text = modal.inner_text().lower()
-                        except Exception:
-                            continue
-                        
-                        # 检查是否包含登录关键词
-                        if any(keyword.lower() in modal_text for keyword in all_login_keywords):
-                            # 进一步检查弹窗中是否有密码输入框或用户名输入框
-                            has_password_in_modal = False
-                            has_username_in_modal = False
-                            
-                            try:
-                                password_in_modal = modal.locator("input[type='password']")
-                                if password_in_modal.count() > 0:
-                                    has_password_in_modal = True
-                            except Exception:
-                                pass
-                            
-                            try:
-                                username_selectors = [
-                                    "input[type='text']",
-                                    "input[type='email']",
-                                    "input[name*='user']",
-                                    "input[name*='account']",
-                                    "input[name*='login']",
-                                    "input[placeholder*='user']",
-                                    "input[placeholder*='account']",
-                                ]
-                                for username_sel in username_selectors:
-                                    if modal.locator(username_sel).count() > 0:
-                                        has_username_in_modal = True
-                                        break
-                            except Exception:
-                                pass
-                            
-                            if has_password_in_modal or (has_username_in_modal and any(kw in modal_text for kw in ["登录", "login", "sign"])):
-                                return True, f"Login modal/popup detected (contains login keywords and form fields)"
-                            
-                            # 即使没有明确的表单字段，如果包含登录关键词也可能需要登录
-                            if any(kw in modal_text for kw in login_keywords_cn + ["login", "sign in"]):
-                                return True, f"Login modal/popup detected (contains login keywords)"
-                except Exception:
-                    continue
-            
-            # 4. 检测页面主体中的登录相关文本和表单
-            try:
-                page_text = self.page.inner_text("body").lower()
-                if any(keyword.lower() in page_text for keyword in all_login_keywords):
-                    # 检查页面是否有用户名/密码输入框组合
-                    try:
-                        username_inputs = self.page.locator(
-                            "input[type='text'], input[type='email'], input[name*='user'], input[name*='account']"
-                        )
-                        password_inputs = self.page.locator("input[type='password']")
-                        
-                        if username_inputs.count() > 0 and password_inputs.count() > 0:
-                            return True, "Login form detected on page (username + password inputs)"
-                    except Exception:
-                        pass
-            except Exception:
-                pass
-            
-            return False, ""
+            # 2. 页面上的密码输入框、3. 弹窗/模态框中的登录内容：
+            # 在页面内一次性完成，避免逐个 count/is_visible/inner_text 的往返调用
+            has_login, detection_info = self._evaluate_hot(
+                _LOGIN_DETECTION_EXPR, _LOGIN_DETECTION_JS, _LOGIN_DETECTION_ARGS
+            )
+            return bool(has_login), detection_info
         except Exception as e:
             # 如果检测过程中出错，保守处理，不触发登录等待
-            print(f"[WARN] Error during login detection: {e}")
+            _logger.warning("[BrowserService] Error during login detection: %s", e)
             return False, ""
 
     def _maybe_wait_for_manual_login(self):
@@ -323,16 +983,27 @@ class BrowserService:
         if self._headless or self._login_prompt_shown:
             return
 
-        # 给页面一点时间加载弹窗（如果存在）
-        try:
-            self.page.wait_for_timeout(1000)  # 等待1秒，让弹窗有时间出现
-        except Exception:
-            pass
-        
-        # 综合检测登录界面
-        has_login, detection_info = self._detect_login_interface()
+        url = self.page.url or ""
+        if url in self._login_cache:
+            # 同一页面、期间没有导航或变更操作，沿用上一次「非登录界面」的检测结果
+            return
+
+        if self._LOGIN_URL_RE.search(url):
+            # URL 已命中登录关键词，无需等待弹窗，也无需查询页面元素
+            has_login, detection_info = True, "URL contains login keywords"
+        else:
+            # 给页面一点时间加载弹窗（如果存在）：密码框或弹窗一出现就结束等待，最多等待1秒
+            try:
+                self.page.wait_for_selector(_LOGIN_APPEAR_SELECTOR, state="visible", timeout=1000)
+            except (TimeoutError, Error):
+                pass
+
+            # 综合检测登录界面
+            has_login, detection_info = self._detect_login_interface()
         
-        if has_login:
+        if not has_login:
+            self._login_cache[url] = (has_login, detection_info)
+        else:
             self._login_prompt_shown = True
             print("\n" + "=" * 70)
             print("[HUMAN-ASSIST] 🔐 登录界面检测")
@@ -345,59 +1016,94 @@ class BrowserService:
             try:
                 input()
                 print("[HUMAN-ASSIST] ✅ 已收到确认，继续执行任务...\n")
+                self._save_storage_state()
                 # 重置标志，允许后续再次检测（例如页面跳转后可能再次出现登录）
                 self._login_prompt_shown = False
             except EOFError:
                 # 在无法交互的环境下，直接继续，不阻塞
                 print("[HUMAN-ASSIST] ⚠️  Input not available; continuing without manual login wait.\n")
 
+    def _ensure_dir(self, directory: str) -> None:
+        """创建目录（如不存在）；同一目录在实例生命周期内只调用一次 makedirs。"""
+        if directory and directory not in self._ensured_dirs:
+            os.makedirs(directory, exist_ok=True)
+            self._ensured_dirs.add(directory)
+
+    def _save_storage_state(self) -> None:
+        """人工登录完成后保存 Cookie/localStorage，供下次启动时直接复用登录态。"""
+        if not self._storage_state_path:
+            return
+        try:
+            self._ensure_dir(os.path.dirname(os.path.abspath(self._storage_state_path)))
+            self.context.storage_state(path=self._storage_state_path)
+            _logger.info("[BrowserService] Login state saved: %s", self._storage_state_path)
+        except Exception as e:
+            _logger.warning("[BrowserService] Failed to save login state: %s", e)
+
     def _get_selector(self, args: Dict) -> str:
         """
         [工业最终版] 解析定位器。
         支持：XPath, CSS Selector, 文本定位, 和新增的父子组合定位 (container_selector + relative_selector)。
+        相同参数组合的编译结果由 _compile_selector 的 LRU 缓存复用。
         """
-        # 1. 精确 XPath
-        if "xpath" in args and args["xpath"]:
-            return f"xpath={args['xpath']}"
-            
-        # 2. CSS Selector (标准定位)
-        if "selector" in args and args["selector"]:
-            return args["selector"]
-            
-        # 3. 父子组合定位 (Container + Relative)
-        if "container_selector" in args and args["container_selector"]:
-            # 使用 Playwright 的复合定位语法: "父定位器 >> 子定位器"
-            container = args["container_selector"]
-            relative = args.get("relative_selector", "") 
-            if not relative:
-                return container
-            return f"{container} >> {relative}" 
-            
-        # 4. 基于文本内容的智能定位 (兼容旧格式)
-        if "text_content" in args and args["text_content"]:
-            text = args['text_content']
-            if "tag_hint" in args and args["tag_hint"]:
-                return f"{args['tag_hint']}:has-text('{text}')"
-            else:
-                return f"*:has-text('{text}')"
-            
+        key = tuple(args.get(name) for name in _SELECTOR_ARG_KEYS)
+        try:
+            selector = _compile_selector(*key)
+        except TypeError:
+            # 参数值不可哈希（如 LLM 给出了列表），跳过缓存直接编译
+            selector = _compile_selector.__wrapped__(*key)
+        if selector:
+            return selector
+
         raise ValueError(f"JSON Error: No valid selector provided in args: {args.keys()}")
 
+    def _locator(self, selector: str) -> Locator:
+        """
+        返回 selector 对应的 Locator（复用缓存）。
+        取 .first 以保持与 page.click/page.fill 相同的「匹配多个时取第一个」语义。
+        """
+        locator = self._locator_cache.get(selector)
+        if locator is None:
+            locator = self.page.locator(selector).first
+            self._locator_cache[selector] = locator
+        return locator
+
     def _perform_pre_actions(self, actions: List[Dict[str, Any]], timeout_ms: int) -> None:
         """
         在执行特定工具（如 extract_data）前，执行一组简单的页面交互操作。
         支持 click/scroll/wait，便于在提取前唤起或加载更多内容。
+        连续的 scroll/wait 合并为一次 page.evaluate；click 始终通过 Playwright 定位器执行。
         """
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+
+        def _flush_batch():
+            if not batch:
+                return
+            steps = [step for _, step in batch]
+            try:
+                errors = self.page.evaluate(_PRE_ACTIONS_JS, steps)
+            except Exception as exc:
+                errors = [str(exc)] * len(steps)
+            for (idx, step), error in zip(batch, errors):
+                if error:
+                    _logger.warning("[BrowserService] pre_action #%s (%s) failed: %s", idx, step['type'], error)
+            batch.clear()
+
         for idx, pre_action in enumerate(actions):
             action_type = (pre_action or {}).get("type")
             if not action_type:
                 continue
 
+            step = self._in_page_pre_action(pre_action)
+            if step is not None:
+                batch.append((idx, step))
+                continue
+            _flush_batch()
+
             try:
                 if action_type == "click":
                     selector = self._get_selector(pre_action)
-                    self.page.wait_for_selector(selector, state="visible", timeout=timeout_ms)
-                    self.page.click(selector, timeout=timeout_ms)
+                    self._locator(selector).click(timeout=timeout_ms)
                 elif action_type == "scroll":
                     direction = pre_action.get("direction", "down")
                     amount = int(pre_action.get("amount", 800))
@@ -407,11 +1113,30 @@ class BrowserService:
                         self.page.mouse.wheel(0, -abs(amount))
                 elif action_type == "wait":
                     duration = float(pre_action.get("duration", 1))
-                    time.sleep(max(0.0, duration))
+                    # 通过 Playwright 等待，期间浏览器事件（导航、响应等）照常处理
+                    self.page.wait_for_timeout(max(0.0, duration) * 1000)
                 else:
-                    print(f"[BrowserService] Unknown pre_action '{action_type}' ignored.")
+                    _logger.warning("[BrowserService] Unknown pre_action '%s' ignored.", action_type)
             except Exception as exc:
-                print(f"[BrowserService] pre_action #{idx} ({action_type}) failed: {exc}")
+                _logger.warning("[BrowserService] pre_action #%s (%s) failed: %s", idx, action_type, exc)
+
+        _flush_batch()
+
+    @staticmethod
+    def _in_page_pre_action(pre_action: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        把 pre_action 转为可在页面内执行的步骤；无法在页面内等价执行时返回 None。
+        """
+        action_type = pre_action.get("type")
+        try:
+            if action_type == "scroll":
+                amount = abs(int(pre_action.get("amount", 800)))
+                return {"type": "scroll", "amount": amount if pre_action.get("direction", "down") == "down" else -amount}
+            if action_type == "wait":
+                return {"type": "wait", "duration": max(0.0, float(pre_action.get("duration", 1)))}
+        except (TypeError, ValueError):
+            return None
+        return None
 
     # 在 BrowserService 类中新增一个方法，用于执行后的验证
     def _verify_post_action(self, action: DecisionAction, initial_url: str) -> bool:
@@ -424,68 +1149,120 @@ class BrowserService:
                 # 检查页面是否只是局部刷新，或者确实没有跳转
                 if action.tool_name == "click_element":
                     # 只有点击链接后 URL 仍未变，才认为是失败 (除非预期就是局部刷新)
-                    print(f"    [VERIFY] Click executed, but URL did not change from {initial_url}. Assuming failure to navigate.")
+                    _logger.warning("    [VERIFY] Click executed, but URL did not change from %s. Assuming failure to navigate.", initial_url)
                     return False
                 # 对于 navigate_to，URL 应该等于目标 URL，如果等于初始 URL 则是网络问题
                 
         # 成功通过验证
         return True
 
-    def _extract_interactive_elements(self) -> List[KeyElement]:
-        """扫描页面，提取对 AI 有意义的交互元素，修复了 JS 注入时的语法错误。"""
-        elements = []
-        
-        js_script = """
-        () => {
-            const items = [];
-            const tags = ['a', 'button', 'input', 'textarea', 'select'];
-            document.querySelectorAll(tags.join(',')).forEach((el, index) => {
-                const rect = el.getBoundingClientRect();
-                const isVisible = rect.width > 0 && rect.height > 0 && window.getComputedStyle(el).visibility !== 'hidden';
-                
-                if (isVisible) {
-                    items.push({
-                        element_id: el.id || `gen_id_${index}`,
-                        tag_name: el.tagName.toLowerCase(),
-                        inner_text: el.innerText.slice(0, 50) || el.value || "", 
-                        x_min: rect.left,
-                        y_min: rect.top,
-                        x_max: rect.right,
-                        y_max: rect.bottom,
-                        xpath: ""
-                    });
-                }
-            });
-            return items;
-        }
+    @staticmethod
+    def _build_key_element(
+        tag_name: str, element_id: str, inner_text: str, xpath: str,
+        x_min: float, y_min: float, x_max: float, y_max: float,
+    ) -> KeyElement:
+        """由采集脚本输出的一个元素构造 KeyElement。"""
+        return KeyElement.model_construct(
+            element_id=element_id,
+            tag_name=tag_name,
+            xpath=xpath,
+            inner_text=inner_text.strip(),
+            is_visible=True,
+            is_clickable=True,
+            bbox=BoundingBox.model_construct(
+                x_min=x_min,
+                y_min=y_min,
+                x_max=x_max,
+                y_max=y_max,
+            ),
+            purpose_hint=None,
+        )
+
+    def _observe_page(self, include_elements: bool = True) -> Tuple[int, List[KeyElement]]:
         """
-        
+        构造观测所需的页面数据：(主文档状态码, 交互元素列表)。
+        DOM 指纹比较、导航后的状态码查询与元素采集在一次页面往返中完成；
+        指纹与上一次相同时页面内不重新采集，直接复用缓存的元素列表。
+        """
+        if not include_elements:
+            return self._current_http_status(), []
+
+        want_status = self._http_status_stale
+        self._http_status_stale = False
+        args = [self._max_elements, self._last_dom_fingerprint, want_status]
         try:
-            raw_data = self.page.evaluate(js_script)
-            
-            for item in raw_data:
-                xpath = f"//{item['tag_name']}[@id='{item['element_id']}']" if "gen_id" not in item['element_id'] else f"//{item['tag_name']}"
-
-                elements.append(KeyElement(
-                    element_id=item['element_id'],
-                    tag_name=item['tag_name'],
-                    xpath=xpath, 
-                    inner_text=item['inner_text'].strip(),
-                    is_visible=True,
-                    is_clickable=True,
-                    bbox=BoundingBox(
-                        x_min=item['x_min'],
-                        y_min=item['y_min'],
-                        x_max=item['x_max'],
-                        y_max=item['y_max']
-                    ),
-                    purpose_hint=None
-                ))
+            raw_data = self._evaluate_hot(
+                f"window.__observe ? window.__observe({json.dumps(args)[1:-1]}) : null",
+                _CALL_OBSERVER_JS,
+                args,
+            )
+            if raw_data is None:
+                # 当前文档早于 init script 加载（如初始 about:blank），补装一次页面函数
+                self.page.evaluate(_AGENT_INIT_SCRIPT)
+                raw_data = self.page.evaluate(_CALL_OBSERVER_JS, args)
+            fingerprint, status, columns = raw_data
         except Exception as e:
-            print(f"[WARN] Error extracting elements: {e}")
-            
-        return elements
-        
+            _logger.warning("[BrowserService] Error extracting elements: %s", e)
+            self._last_dom_fingerprint = None
+            self._cached_elements = []
+            return self._last_http_status, []
+
+        if status:
+            self._last_http_status = int(status)
+        if columns is not None:
+            self._cached_elements = self._parse_element_columns(columns)
+            self._last_dom_fingerprint = fingerprint
+        return self._last_http_status, list(self._cached_elements)
+
+    def _parse_element_columns(self, columns: List[str]) -> List[KeyElement]:
+        """解析采集脚本返回的按列组织的元素数据。"""
+        # 字段由采集脚本生成、格式固定，使用 model_construct 跳过逐字段校验
+        tags_col, ids_col, coords_col, texts_col, xpaths_col = columns
+        if not tags_col:
+            return []
+        coords = [float(v) for v in coords_col.split(",")]
+        return [
+            self._build_key_element(tag_name, element_id, inner_text, xpath, *coords[i * 4:i * 4 + 4])
+            for i, (tag_name, element_id, inner_text, xpath) in enumerate(
+                zip(tags_col.split("\t"), ids_col.split("\t"), texts_col.split("\t"), xpaths_col.split("\t"))
+            )
+        ]
+
+    def _capture_screenshot_bytes(self, full_page: bool) -> bytes:
+        """
+        截取当前页面的 PNG 字节。
+        同一页面上视口尺寸和 full_page 参数与上一次相同时进入 burst 模式，
+        通过 CDP 直接调用 Page.captureScreenshot；否则走 Playwright 的完整截图流程并记录状态。
+        """
+        viewport = self.page.viewport_size or {"width": 0, "height": 0}
+        state = (viewport["width"], viewport["height"], full_page)
+        if state == self._burst_state:
+            try:
+                cdp = self._get_cdp_session()
+                params: Dict[str, Any] = {"format": "png"}
+                if full_page:
+                    size = cdp.send("Page.getLayoutMetrics")["cssContentSize"]
+                    params["captureBeyondViewport"] = True
+                    params["clip"] = {"x": 0, "y": 0, "width": size["width"], "height": size["height"], "scale": 1}
+                return base64.b64decode(cdp.send("Page.captureScreenshot", params)["data"])
+            except Error as e:
+                _logger.warning("[BrowserService] Burst screenshot failed, falling back to page.screenshot: %s", e)
+                self._cdp_session = None
+
+        data = self.page.screenshot(full_page=full_page)
+        self._burst_state = state
+        return data
+
+    def _get_truncated_html(self, max_len: int = 50000) -> str:
+        """
+        获取供 LLM 分析的精简 HTML（主体区域、去除脚本样式、页面内截断），避免传输整页 HTML。
+        """
+        try:
+            return self.page.evaluate(_TRUNCATED_HTML_JS, max_len)
+        except Error as e:
+            _logger.warning("[BrowserService] In-page HTML truncation failed, falling back to page.content(): %s", e)
+            return self.page.content()[:max_len]
+
     def get_element_attribute(self, selector: str, attribute_name: str) -> str:
         """
         根据 CSS Selector 定位元素并提取指定的属性值。
@@ -495,7 +1272,7 @@ class BrowserService:
         """
         try:
             # 使用 page.locator 来获取元素，并等待它处于可见状态
-            locator = self.page.locator(selector)
+            locator = self._locator(selector)
             # 等待元素可见，最多等待 10 秒
             locator.wait_for(state="visible", timeout=10000) 
             
@@ -505,10 +1282,10 @@ class BrowserService:
             return attribute_value if attribute_value is not None else ""
         
         except TimeoutError:
-            print(f"[BrowserService] Error: Element not visible or attribute not found for selector: {selector}")
+            _logger.warning("[BrowserService] Error: Element not visible or attribute not found for selector: %s", selector)
             return ""
         except Error as e:
-            print(f"[BrowserService] Playwright Error during get_element_attribute: {e}")
+            _logger.warning("[BrowserService] Playwright Error during get_element_attribute: %s", e)
             return ""
 
     def _launch_notepad(self, action: DecisionAction, feedback: ActionFeedback):
@@ -519,759 +1296,1039 @@ class BrowserService:
         initial_content = action.tool_args.get("initial_content")
 
         if file_path:
-            target_path = os.path.abspath(file_path)
-            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            target_path = self._resolved_paths.get(file_path)
+            if target_path is None:
+                target_path = os.path.abspath(file_path)
+                self._resolved_paths[file_path] = target_path
+            self._ensure_dir(os.path.dirname(target_path))
         else:
             fd, temp_path = tempfile.mkstemp(prefix="agent_note_", suffix=".txt")
             os.close(fd)
             target_path = temp_path
 
-        if initial_content:
-            with open(target_path, "w", encoding="utf-8") as f:
-                f.write(initial_content)
+        if sys.platform != "win32":
+            # 非 Windows 环境没有记事本：只写入内容并返回失败，不尝试启动进程
+            if initial_content:
+                with open(target_path, "w", encoding="utf-8") as f:
+                    f.write(initial_content)
+            feedback.status = "FAILED"
+            feedback.error_code = "NOTEPAD_UNSUPPORTED_PLATFORM"
+            feedback.message = f"Notepad is only available on Windows. Content saved to: {target_path}"
+            raise RuntimeError(feedback.message)
+
+        errors: List[Exception] = []
 
-        try:
-            subprocess.Popen(["notepad.exe", target_path], creationflags=subprocess.DETACHED_PROCESS)
+        def _write_and_launch():
+            # 先写入内容再启动，保证记事本打开时文件已就绪
+            try:
+                if initial_content:
+                    with open(target_path, "w", encoding="utf-8") as f:
+                        f.write(initial_content)
+                # ShellExecute 直接启动，不经过 subprocess 创建管道和控制台
+                os.startfile("notepad.exe", "open", f'"{target_path}"')
+            except Exception as exc:
+                errors.append(exc)
+                _logger.warning("[BrowserService] Failed to open Notepad: %s", exc)
+
+        # 写盘和启动放到后台线程，默认不阻塞当前动作；tool_args.sync=True 时等待完成
+        worker = threading.Thread(target=_write_and_launch, name="notepad-launcher")
+        worker.start()
+        if not action.tool_args.get("sync", False):
             feedback.status = "SUCCESS"
-            feedback.message = f"Notepad opened for file: {target_path}"
-        except Exception as exc:
+            feedback.message = f"Notepad launching for file: {target_path}"
+            return
+
+        worker.join()
+        if errors:
             feedback.status = "FAILED"
             feedback.error_code = "NOTEPAD_LAUNCH_ERROR"
-            feedback.message = f"Failed to open Notepad: {exc}"
-            raise
+            feedback.message = f"Failed to open Notepad: {errors[0]}"
+            raise errors[0]
+        feedback.status = "SUCCESS"
+        feedback.message = f"Notepad opened for file: {target_path}"
 
-    def execute_action(self, action: DecisionAction) -> WebObservation:
+    def _action_cache_key(self, action: DecisionAction) -> Optional[str]:
+        """计算只读动作的缓存键；不可缓存的动作返回 None。"""
+        if action.tool_name not in _CACHEABLE_TOOLS:
+            return None
+        base_url = self.page.url.split("#", 1)[0]
+        try:
+            args = json.dumps(action.tool_args, sort_keys=True, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return None
+        return hashlib.sha1(f"{base_url}\n{action.tool_name}\n{args}".encode("utf-8")).hexdigest()
+
+    def _lookup_action_cache(self, key: str) -> Optional[ActionFeedback]:
+        entry = self._action_cache.get(key)
+        if entry is None:
+            return None
+        cached_at, cached_feedback = entry
+        if time.time() - cached_at > _ACTION_CACHE_TTL_SECONDS:
+            del self._action_cache[key]
+            return None
+        self._action_cache.move_to_end(key)
+        return cached_feedback
+
+    def _store_action_cache(self, key: str, feedback: ActionFeedback) -> None:
+        self._action_cache[key] = (time.time(), feedback.model_copy())
+        self._action_cache.move_to_end(key)
+        while len(self._action_cache) > _ACTION_CACHE_MAX_ENTRIES:
+            self._action_cache.popitem(last=False)
+
+    def _run_action(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
         """
-        核心入口：执行动作 -> 等待页面稳定 -> 提取观测数据
+        执行单个动作本身（不含页面稳定等待与观测构造），失败时直接抛出异常。
         """
-        start_time = time.time()
-        feedback = ActionFeedback(status="SUCCESS", error_code="0", message="Action executed.")
-        initial_url = self.page.url
-        timeout_ms = action.execution_timeout_seconds * 1000
-
+        # 上一个动作的截图可能仍在后台写盘，后续工具（如 OCR）可能会读取它；
+        # 写盘失败不影响本动作本身，记录失败的路径（读取该文件的工具会自行报错）
         try:
-            # 1. 执行具体动作
-            if action.tool_name == "navigate_to":
-                url = action.tool_args.get("url")
-                if not url:
-                    raise ValueError("Missing 'url' in tool_args")
-                self.page.goto(url, wait_until="load", timeout=timeout_ms)
-                # 导航后检查是否命中登录页面
-                self._maybe_wait_for_manual_login()
-                # 捕获页面结构，便于回退和审计
-                self._capture_page_structure(task_topic=action.tool_args.get("task_topic", "page_structure"))
+            wait_for_screenshot_writes()
+        except OSError as e:
+            _logger.error("[BrowserService] %s", e)
+
+        if action.tool_name in _DOM_MUTATING_TOOLS:
+            # 变更类操作之后的元素扫描和登录检测不能复用缓存
+            self._last_dom_fingerprint = None
+            self._login_cache.clear()
+
+        if action.tool_name in _VISUAL_TOOLS:
+            # 视觉类工具需要完整渲染的页面
+            self._ensure_full_render(timeout_ms)
+
+        handler = self._tool_handlers.get(action.tool_name)
+        if handler is None:
+            raise ValueError(f"Unsupported tool: {action.tool_name}")
+        handler(action, feedback, timeout_ms)
+
+    def _tool_navigate_to(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """打开指定 URL，等待页面加载并检测登录界面。"""
+        args = action.tool_args
+        url = args.get("url")
+        if not url:
+            raise ValueError("Missing 'url' in tool_args")
+        self._set_resource_blocking(bool(args.get("block_resources", self._block_resources_default)))
+        self._locator_cache.clear()
+        # 默认 goto 只等 DOM 就绪（domcontentloaded），随后由 _wait_for_page_load 轮询 readyState 到 complete
+        # （即 load 事件），最多 3 秒：子资源迟迟不结束时最多多等 3 秒，而不是耗满动作超时。
+        # 需要时可通过 wait_until 覆盖（如 "load"）
+        wait_until = args.get("wait_until", "domcontentloaded")
+        self.page.goto(url, wait_until=wait_until, timeout=timeout_ms)
+        if wait_until not in ("load", "networkidle"):
+            # goto 已等到 load 时 readyState 必然是 complete，无需再轮询
+            self._wait_for_page_load()
+        # 导航后检查是否命中登录页面
+        self._maybe_wait_for_manual_login()
+        # 捕获页面结构，便于回退和审计
+        self._capture_page_structure(task_topic=args.get("task_topic", "page_structure"))
+
+    def _tool_type_text(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """向目标输入框填充文本，可选按下提交键。"""
+        args = action.tool_args
+        selector = self._get_selector(args)
+        text = args.get("text", "")
+        submit_key = args.get("submit_key") # <-- 获取提交键参数
+
+        # 1. 填充文本：fill 自带可操作性检查（等待元素可见、可编辑），无需先单独 wait_for。
+        # 隐藏或被遮挡的输入框可通过 force=True 跳过检查。
+        locator = self._locator(selector)
+        locator.fill(text, timeout=timeout_ms, force=bool(args.get("force", False)))
+        
+        # 2. 【人类模拟操作】如果指定了提交键，则按下它来提交表单
+        if submit_key:
+            # fill 之后焦点已在目标元素上，直接发送按键，无需再次解析 selector
+            self.page.keyboard.press(submit_key)
+            _logger.info("[BrowserService] Human-like simulation: Pressed '%s' on %s to submit.", submit_key, selector)
+            # 调用方提供了提交后的目标元素时才等待，否则不额外等待
+            expected_selector = args.get("expected_selector")
+            if expected_selector:
+                self.page.wait_for_selector(expected_selector, state="attached", timeout=timeout_ms)
+
+    def _tool_get_element_attribute(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """读取目标元素的属性值。"""
+        args = action.tool_args
+        selector = self._get_selector(args)
+        attribute_name = args.get("attribute_name", "href")
+        
+        _logger.info("    -> Extracting attribute '%s' from target: %s", attribute_name, selector)
+        
+        # 调用新添加的方法
+        extracted_value = self.get_element_attribute(selector, attribute_name)
+        
+        if extracted_value:
+            # 将提取到的值存入 feedback.message，作为 SUCCESS 时的结果
+            feedback.message = f"Attribute '{attribute_name}' extracted: {extracted_value}"
+            feedback.status = "SUCCESS"
+        else:
+            feedback.status = "FAILED"
+            feedback.error_code = "ATTRIBUTE_NOT_FOUND"
+            feedback.message = f"Failed to extract attribute '{attribute_name}' from {selector}. Target not found or attribute missing."
+            raise Error(feedback.message)
+
+    def _tool_extract_data(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """提取页面内容（OCR / LLM / 高级提取 / 简单提取）。"""
+        args = action.tool_args
+        # 参数提取
+        selector = args.get("selector")
+        attribute = args.get("attribute", "text")  # 默认提取元素的文本
+        limit = args.get("limit")  # 可以是 None（提取全部）
+        pre_actions = args.get("pre_actions", [])
+        # 【重要】默认使用OCR模式提取内容
+        extract_mode = args.get("mode", "ocr")  # 默认使用OCR模式
+        use_ocr = args.get("use_ocr", True)  # 默认使用OCR（除非明确设置为False）
+        use_llm = args.get("use_llm", True)  # 默认使用 LLM 分析OCR结果
+        extraction_instruction = args.get("extraction_instruction", "")  # LLM 提取指令
+        prepare_page = args.get("prepare_page", True)  # 是否准备页面（展开折叠、触发懒加载等）
+
+        # OCR 路径截取的是渲染后的页面，下面的图文比例判断也依赖图片尺寸：
+        # 在准备页面之前恢复完整渲染，避免重新加载冲掉展开/懒加载的结果
+        if OCR_AVAILABLE and (use_ocr or extract_mode in ("ocr", "comprehensive")):
+            self._ensure_full_render(timeout_ms)
+
+        if not selector:
+            # 回退到通用选择器解析逻辑（支持 xpath / text_content 等）
+            try:
+                selector = self._get_selector(args)
+            except Exception:
+                selector = None
+
+        # 【关键增强】在提取前全面准备页面，模拟人类操作
+        if prepare_page:
+            _logger.info("[BrowserService] Preparing page for extraction (expanding collapsible content, triggering lazy load)...")
+            try:
+                prepare_page_for_extraction(self.page)
+            except Exception as e:
+                _logger.warning("[BrowserService] Page preparation warning: %s", e)
+
+        if isinstance(pre_actions, list) and pre_actions:
+            self._perform_pre_actions(pre_actions, timeout_ms)
+
+        results = []
+        extraction_done = False
+        
+        # 检查是否需要提取博客正文内容
+        extract_blog_mode = args.get("extract_blog_content", False)
+        content_type = args.get("content_type", "blog_content")  # 默认提取博客内容
+        
+        # 调用方未指定提取方式时，文本为主的页面跳过截图 + OCR，直接使用 HTML 提取
+        if OCR_AVAILABLE and "mode" not in args and "use_ocr" not in args:
+            try:
+                text_rich = self.page.evaluate(
+                    _TEXT_RICH_PAGE_JS, [_OCR_SKIP_MIN_TEXT_LENGTH, _OCR_SKIP_MAX_IMAGE_RATIO]
+                )
+            except Error:
+                text_rich = False
+            if text_rich:
+                _logger.info("[BrowserService] Text-rich page detected, skipping OCR and using HTML-based extraction...")
+                use_ocr = False
+                extract_mode = "llm" if use_llm else "advanced"
+
+        # 【重要】默认使用OCR方式提取内容（如果OCR可用）
+        if OCR_AVAILABLE and (use_ocr or extract_mode == "ocr" or extract_mode == "comprehensive"):
+            _logger.info("[BrowserService] Using OCR-based extraction (screenshot + OCR)...")
             
-            elif action.tool_name == "type_text":
-                selector = self._get_selector(action.tool_args)
-                text = action.tool_args.get("text", "")
-                submit_key = action.tool_args.get("submit_key") # <-- 获取提交键参数
-
-                # 1. 填充文本：等待元素存在于 DOM 中，并强制填充。
-                self.page.wait_for_selector(selector, state="attached", timeout=timeout_ms)
-                self.page.fill(selector, text, timeout=timeout_ms, force=True)
-                
-                # 2. 【人类模拟操作】如果指定了提交键，则按下它来提交表单
-                if submit_key:
-                    # 使用 page.press 模拟键盘操作，更鲁棒
-                    self.page.press(selector, submit_key)
-                    print(f"[BrowserService] Human-like simulation: Pressed '{submit_key}' on {selector} to submit.")
-                
-            elif action.tool_name == "get_element_attribute":
-                selector = self._get_selector(action.tool_args)
-                attribute_name = action.tool_args.get("attribute_name", "href")
-                
-                print(f"    -> Extracting attribute '{attribute_name}' from target: {selector}")
-                
-                # 调用新添加的方法
-                extracted_value = self.get_element_attribute(selector, attribute_name)
-                
-                if extracted_value:
-                    # 将提取到的值存入 feedback.message，作为 SUCCESS 时的结果
-                    feedback.message = f"Attribute '{attribute_name}' extracted: {extracted_value}"
-                    feedback.status = "SUCCESS"
-                else:
-                    feedback.status = "FAILED"
-                    feedback.error_code = "ATTRIBUTE_NOT_FOUND"
-                    feedback.message = f"Failed to extract attribute '{attribute_name}' from {selector}. Target not found or attribute missing."
-                    raise Error(feedback.message)
-                
-            elif action.tool_name == "extract_data":
-                # 参数提取
-                selector = action.tool_args.get("selector")
-                attribute = action.tool_args.get("attribute", "text")  # 默认提取元素的文本
-                limit = action.tool_args.get("limit")  # 可以是 None（提取全部）
-                pre_actions = action.tool_args.get("pre_actions", [])
-                # 【重要】默认使用OCR模式提取内容
-                extract_mode = action.tool_args.get("mode", "ocr")  # 默认使用OCR模式
-                use_ocr = action.tool_args.get("use_ocr", True)  # 默认使用OCR（除非明确设置为False）
-                use_llm = action.tool_args.get("use_llm", True)  # 默认使用 LLM 分析OCR结果
-                extraction_instruction = action.tool_args.get("extraction_instruction", "")  # LLM 提取指令
-                prepare_page = action.tool_args.get("prepare_page", True)  # 是否准备页面（展开折叠、触发懒加载等）
-
-                if not selector:
-                    # 回退到通用选择器解析逻辑（支持 xpath / text_content 等）
-                    try:
-                        selector = self._get_selector(action.tool_args)
-                    except Exception:
-                        selector = None
-
-                # 【关键增强】在提取前全面准备页面，模拟人类操作
-                if prepare_page:
-                    print("[BrowserService] Preparing page for extraction (expanding collapsible content, triggering lazy load)...")
-                    try:
-                        prepare_page_for_extraction(self.page)
-                    except Exception as e:
-                        print(f"[BrowserService] Page preparation warning: {e}")
-
-                if isinstance(pre_actions, list) and pre_actions:
-                    self._perform_pre_actions(pre_actions, timeout_ms)
-
-                results = []
-                extraction_done = False
-                
-                # 检查是否需要提取博客正文内容
-                extract_blog_mode = action.tool_args.get("extract_blog_content", False)
-                content_type = action.tool_args.get("content_type", "blog_content")  # 默认提取博客内容
-                
-                # 【重要】默认使用OCR方式提取内容（如果OCR可用）
-                if OCR_AVAILABLE and (use_ocr or extract_mode == "ocr" or extract_mode == "comprehensive"):
-                    print("[BrowserService] Using OCR-based extraction (screenshot + OCR)...")
-                    
-                    # 1. 先截图
-                    task_topic = action.tool_args.get("task_topic", "extract_content")
-                    screenshot_path = take_screenshot(
-                        page=self.page,
-                        task_topic=task_topic,
-                        filename=None,
-                        full_page=True,
-                        custom_path=None,
-                    )
-                    
-                    # 2. 使用OCR提取文字
-                    print(f"[BrowserService] Extracting text from screenshot: {screenshot_path}")
-                    ocr_result = extract_text_from_screenshot(
-                        screenshot_path=screenshot_path,
-                        languages=["ch_sim", "en"],
-                        detail=0,
-                    )
-                    
-                    if not ocr_result.get("success"):
-                        print(f"[BrowserService] OCR extraction failed: {ocr_result.get('error')}")
-                        print("[BrowserService] Falling back to HTML-based extraction...")
-                        use_ocr = False
-                    else:
-                        ocr_text = ocr_result.get("text", "")
-                        if not ocr_text or len(ocr_text.strip()) < 10:
-                            print("[BrowserService] OCR extracted empty or very short text")
-                            print("[BrowserService] Falling back to HTML-based extraction...")
-                            use_ocr = False
-                        else:
-                            # 3. 使用LLM分析OCR结果（提取结构化信息）
-                            if use_llm:
-                                print("[BrowserService] Analyzing OCR text with LLM...")
-                                
-                                if extract_blog_mode or content_type == "blog_content":
-                                    # 提取博客内容
-                                    if not extraction_instruction:
-                                        extraction_instruction = (
-                                            "请从以上OCR识别的文本中提取博客/文章内容，包括："
-                                            "1. 文章标题（title）- 如果有的话"
-                                            "2. 正文内容（content）- 完整的文章正文文本，这是最重要的"
-                                            "3. 作者信息（author，如果存在）"
-                                            "4. 发布时间（publish_time，如果存在）"
-                                            "忽略导航栏、页脚、广告、评论区等无关内容，只提取文章的核心正文内容。"
-                                            "返回JSON格式：{\"title\": \"标题\", \"content\": \"正文内容\", \"author\": \"作者\", \"publish_time\": \"时间\"}"
-                                        )
-                                    
-                                    llm_result = analyze_ocr_text_with_llm(ocr_text, extraction_instruction)
-                                    
-                                    if llm_result.get("success") and "data" in llm_result:
-                                        blog_data = llm_result["data"]
-                                        if "content" not in blog_data or not blog_data.get("content"):
-                                            blog_data["content"] = ocr_text
-                                        results = [blog_data]
-                                    else:
-                                        print("[BrowserService] LLM analysis failed, using raw OCR text")
-                                        results = [{
-                                            "title": "",
-                                            "content": ocr_text,
-                                            "author": "",
-                                            "publish_time": "",
-                                            "url": self.page.url
-                                        }]
-                                else:
-                                    # 提取链接或其他内容
-                                    if not extraction_instruction:
-                                        extraction_instruction = (
-                                            "请从以上OCR识别的文本中提取所有可以跳转的URL链接，"
-                                            "格式为标题和URL的对应关系。"
-                                            "忽略导航栏、页脚、广告等无关链接。"
-                                        )
-                                    
-                                    llm_result = analyze_ocr_text_with_llm(ocr_text, extraction_instruction)
-                                    
-                                    if llm_result.get("success") and "data" in llm_result:
-                                        data = llm_result["data"]
-                                        if "items" in data:
-                                            results = data["items"]
-                                        elif "links" in data:
-                                            results = data["links"]
-                                        else:
-                                            results = [{"text": ocr_text, "url": self.page.url}]
-                                    else:
-                                        results = [{"text": ocr_text, "url": self.page.url}]
-                            else:
-                                # 不使用LLM，直接返回OCR文本
-                                if extract_blog_mode or content_type == "blog_content":
-                                    results = [{
-                                        "title": "",
-                                        "content": ocr_text,
-                                        "author": "",
-                                        "publish_time": "",
-                                        "url": self.page.url
-                                    }]
-                                else:
-                                    results = [{"text": ocr_text, "url": self.page.url}]
-                            
-                            extraction_done = True
-                
-                else:
-                    # OCR不可用，直接使用HTML提取
-                    if not OCR_AVAILABLE:
-                        print("[BrowserService] OCR not available, using HTML-based extraction...")
-                        if OCR_ERROR_DETAILS:
-                            if "DLL" in OCR_ERROR_DETAILS or "c10.dll" in OCR_ERROR_DETAILS:
-                                print("[BrowserService] Note: EasyOCR is installed but cannot load.")
-                                print("[BrowserService] Install Visual C++ Redistributable to enable OCR:")
-                                print("[BrowserService]   https://aka.ms/vs/17/release/vc_redist.x64.exe")
-                    use_ocr = False
-                
-                # 回退到传统方法（如果OCR不可用或用户明确禁用，或OCR阶段未产生结果）
-                if (not use_ocr or extract_mode not in ["ocr"]) and not extraction_done:
-                    if extract_mode == "comprehensive" or (extract_mode == "llm" or use_llm):
-                        # 综合策略：先尝试 LLM 分析，如果失败则回退到高级提取
-                        print("[BrowserService] Using comprehensive extraction strategy (LLM + Advanced)...")
-                        
-                        # 1. 先尝试 LLM 分析
-                        html_content = self.page.content()
-                        
-                        if extraction_instruction:
-                            extraction_instruction_final = extraction_instruction
-                        else:
-                            # 根据内容类型生成不同的默认指令
-                            if extract_blog_mode or content_type == "blog_content":
-                                extraction_instruction_final = (
-                                    "提取当前页面的博客/文章正文内容，包括："
-                                    "1. 文章标题（title）"
-                                    "2. 正文内容（content）- 完整的文章正文文本"
-                                    "3. 作者信息（author，如果存在）"
-                                    "4. 发布时间（publish_time，如果存在）"
-                                    "忽略导航栏、页脚、广告、评论区等无关内容，只提取文章的核心正文内容。"
-                                    "返回格式应为JSON，包含title、content、author、publish_time字段。"
-                                )
-                            elif content_type == "both":
-                                extraction_instruction_final = (
-                                    "提取页面中的以下信息："
-                                    "1. 所有可以跳转的 URL 链接（格式为标题和 URL 的对应关系）"
-                                    "2. 如果当前页面是博客/文章页面，提取文章正文内容（包括标题、正文、作者、发布时间）"
-                                    "忽略导航栏、页脚、广告等无关内容，重点关注主要内容区域。"
-                                )
-                            else:
-                                extraction_instruction_final = (
-                                    "提取页面中所有可以跳转的 URL 链接，格式为标题和 URL 的对应关系。"
-                                    "忽略导航栏、页脚、广告等无关链接，重点关注主要内容区域的链接。"
-                                    "包括搜索结果、文章链接、产品链接等所有可点击的链接。"
-                                )
-                        
-                        llm_result = analyze_html_with_llm(
-                            html_content,
-                            extraction_instruction_final,
-                            max_html_length=50000
+            # 1. 先截图：选择器恰好匹配一个元素时只截取该元素的区域，OCR 的输入面积随之缩小；
+            # 匹配多个元素（如 .result-item 列表）或没有匹配时截取整页，避免只识别第一条
+            task_topic = args.get("task_topic", "extract_content")
+            screenshot_data = None
+            if selector:
+                try:
+                    target = self.page.locator(selector)
+                    if target.count() == 1:
+                        screenshot_data = target.screenshot(
+                            timeout=_OCR_ELEMENT_SCREENSHOT_TIMEOUT_MS, type="jpeg", quality=_OCR_SCREENSHOT_QUALITY
                         )
+                except Error as e:
+                    _logger.warning("[BrowserService] Element screenshot failed, using full-page screenshot: %s", e)
+            if screenshot_data is None:
+                # OCR 耗时与像素数近似成正比：超长页面按高度上限裁剪
+                clip = None
+                max_height = int(args.get("max_screenshot_height_px", _OCR_MAX_SCREENSHOT_HEIGHT))
+                if max_height > 0:
+                    width, height = self.page.evaluate(_DOCUMENT_SIZE_JS)
+                    if height > max_height:
+                        clip = {"x": 0, "y": 0, "width": width, "height": max_height}
+                screenshot_data = self.page.screenshot(
+                    full_page=True, clip=clip, type="jpeg", quality=_OCR_SCREENSHOT_QUALITY
+                )
+            # 截图文件只用于留档，后台写盘；OCR 直接使用内存中的图片字节
+            screenshot_path = take_screenshot(
+                page=self.page,
+                task_topic=task_topic,
+                filename=None,
+                full_page=True,
+                custom_path=None,
+                write_in_background=True,
+                data=screenshot_data,
+                image_format="jpeg",
+            )
+            
+            # 2. 使用OCR提取文字
+            _logger.info("[BrowserService] Extracting text from screenshot: %s", screenshot_path)
+            ocr_result = extract_text_from_image_bytes(
+                screenshot_data,
+                languages=["ch_sim", "en"],
+                detail=0,
+                batch_size=int(args["batch_size"]) if args.get("batch_size") else None,
+            )
+            
+            if not ocr_result.get("success"):
+                _logger.warning("[BrowserService] OCR extraction failed: %s", ocr_result.get('error'))
+                _logger.info("[BrowserService] Falling back to HTML-based extraction...")
+                use_ocr = False
+            else:
+                ocr_text = ocr_result.get("text", "")
+                if not ocr_text or len(ocr_text.strip()) < 10:
+                    _logger.info("[BrowserService] OCR extracted empty or very short text")
+                    _logger.info("[BrowserService] Falling back to HTML-based extraction...")
+                    use_ocr = False
+                else:
+                    # 3. 使用LLM分析OCR结果（提取结构化信息）
+                    if use_llm:
+                        _logger.info("[BrowserService] Analyzing OCR text with LLM...")
                         
-                        if llm_result.get("success") and "data" in llm_result:
-                            data = llm_result["data"]
-                            if "items" in data and data["items"]:
-                                results = data["items"]
-                            elif "links" in data and data["links"]:
-                                results = data["links"]
-                            elif "title" in data or "content" in data:
-                                # LLM返回了博客内容格式
-                                results = [data]  # 将博客内容作为单个结果项
-                        
-                        # 2. 如果 LLM 提取失败或结果为空，回退到高级提取
-                        if not results:
-                            print("[BrowserService] LLM extraction returned no results, falling back to advanced extraction...")
+                        if extract_blog_mode or content_type == "blog_content":
+                            # 提取博客内容
+                            if not extraction_instruction:
+                                extraction_instruction = _PROMPT_BLOG_FROM_OCR
                             
-                            if extract_blog_mode or content_type == "blog_content":
-                                # 提取博客正文内容
-                                page_content = extract_page_content(
-                                    page=self.page,
-                                    current_url=self.page.url,
-                                    mode="blog_content",
-                                    selector=selector,
-                                    include_html=False,
-                                )
-                                if "data" in page_content:
-                                    results = [page_content["data"]]  # 将博客内容作为单个结果项
+                            llm_result = analyze_ocr_text_with_llm(ocr_text, extraction_instruction)
+                            
+                            if llm_result.get("success") and "data" in llm_result:
+                                blog_data = llm_result["data"]
+                                if "content" not in blog_data or not blog_data.get("content"):
+                                    blog_data["content"] = ocr_text
+                                results = [blog_data]
                             else:
-                                # 提取链接
-                                page_content = extract_page_content(
-                                    page=self.page,
-                                    current_url=self.page.url,
-                                    mode="links",
-                                    selector=selector,
-                                    limit=limit,
-                                    include_html=False,
-                                )
-                                if "data" in page_content and "links" in page_content["data"]:
-                                    results = page_content["data"]["links"]
-                    
-                    elif extract_mode == "llm":
-                        # 仅使用 LLM 分析
-                        print("[BrowserService] Using LLM-based HTML analysis for extraction...")
-                        html_content = self.page.content()
-                        
-                        if extraction_instruction:
-                            llm_result = analyze_html_with_llm(
-                                html_content,
-                                extraction_instruction,
-                                max_html_length=50000
-                            )
+                                _logger.warning("[BrowserService] LLM analysis failed, using raw OCR text")
+                                results = [{
+                                    "title": "",
+                                    "content": ocr_text,
+                                    "author": "",
+                                    "publish_time": "",
+                                    "url": self.page.url
+                                }]
+                        else:
+                            # 提取链接或其他内容
+                            if not extraction_instruction:
+                                extraction_instruction = _PROMPT_LINKS_FROM_OCR
+                            
+                            llm_result = analyze_ocr_text_with_llm(ocr_text, extraction_instruction)
+                            
                             if llm_result.get("success") and "data" in llm_result:
                                 data = llm_result["data"]
                                 if "items" in data:
                                     results = data["items"]
                                 elif "links" in data:
                                     results = data["links"]
-                                elif "title" in data or "content" in data:
-                                    # LLM返回了博客内容格式
-                                    results = [data]
-                        else:
-                            if extract_blog_mode or content_type == "blog_content":
-                                extraction_instruction_default = (
-                                    "提取当前页面的博客/文章正文内容，包括标题、正文、作者、发布时间。"
-                                    "返回JSON格式，包含title、content、author、publish_time字段。"
-                                )
-                                llm_result = analyze_html_with_llm(
-                                    html_content,
-                                    extraction_instruction_default,
-                                    max_html_length=50000
-                                )
-                                if llm_result.get("success") and "data" in llm_result:
-                                    results = [llm_result["data"]]
+                                else:
+                                    results = [{"text": ocr_text, "url": self.page.url}]
                             else:
-                                results = extract_with_llm_analysis(
-                                    html_content,
-                                    task_description=action.tool_args.get("task_description", "提取页面中所有可跳转的 URL 链接"),
-                                    max_html_length=50000
-                                )
-                    
-                    elif extract_mode == "advanced":
-                        # 使用高级提取工具
-                        print("[BrowserService] Using advanced page content extraction...")
-                        
+                                results = [{"text": ocr_text, "url": self.page.url}]
+                    else:
+                        # 不使用LLM，直接返回OCR文本
                         if extract_blog_mode or content_type == "blog_content":
-                            # 提取博客正文内容
-                            page_content = extract_page_content(
-                                page=self.page,
-                                current_url=self.page.url,
-                                mode="blog_content",
-                                selector=selector,
-                                include_html=False,
-                            )
-                            if "data" in page_content:
-                                results = [page_content["data"]]
+                            results = [{
+                                "title": "",
+                                "content": ocr_text,
+                                "author": "",
+                                "publish_time": "",
+                                "url": self.page.url
+                            }]
                         else:
-                            # 提取链接
-                            page_content = extract_page_content(
-                                page=self.page,
-                                current_url=self.page.url,
-                                mode="links",
-                                selector=selector,
-                                limit=limit,
-                                include_html=False,
-                            )
-                            if "data" in page_content and "links" in page_content["data"]:
-                                results = page_content["data"]["links"]
+                            results = [{"text": ocr_text, "url": self.page.url}]
                     
+                    extraction_done = True
+        
+        else:
+            # OCR不可用，直接使用HTML提取
+            if not OCR_AVAILABLE:
+                _logger.warning("[BrowserService] OCR not available, using HTML-based extraction...")
+                if OCR_ERROR_DETAILS:
+                    if "DLL" in OCR_ERROR_DETAILS or "c10.dll" in OCR_ERROR_DETAILS:
+                        _logger.warning("[BrowserService] Note: EasyOCR is installed but cannot load.")
+                        _logger.warning("[BrowserService] Install Visual C++ Redistributable to enable OCR:")
+                        _logger.warning("[BrowserService]   https://aka.ms/vs/17/release/vc_redist.x64.exe")
+            use_ocr = False
+        
+        # 回退到传统方法（如果OCR不可用或用户明确禁用，或OCR阶段未产生结果）
+        if (not use_ocr or extract_mode not in ["ocr"]) and not extraction_done:
+            if extract_mode == "comprehensive" or (extract_mode == "llm" or use_llm):
+                # 综合策略：优先使用 LLM 分析结果，LLM 失败或结果为空时使用高级提取结果
+                _logger.info("[BrowserService] Using comprehensive extraction strategy (LLM + Advanced)...")
+                
+                # 1. LLM 分析（网络请求）在后台线程进行
+                html_content = self._get_truncated_html()
+                
+                if extraction_instruction:
+                    extraction_instruction_final = extraction_instruction
+                else:
+                    # 根据内容类型生成不同的默认指令
+                    if extract_blog_mode or content_type == "blog_content":
+                        extraction_instruction_final = _PROMPT_BLOG_FROM_HTML
+                    elif content_type == "both":
+                        extraction_instruction_final = _PROMPT_BOTH_FROM_HTML
                     else:
-                        # 使用原有的简单提取逻辑
-                        if limit is None:
-                            limit = 10  # 默认限制
-                        
-                        if extract_blog_mode or content_type == "blog_content":
-                            # 简单模式下也支持提取博客内容
-                            page_content = extract_page_content(
-                                page=self.page,
-                                current_url=self.page.url,
-                                mode="blog_content",
-                                selector=selector,
-                                include_html=False,
-                            )
-                            if "data" in page_content:
-                                results = [page_content["data"]]
-                        else:
-                            results = extract_search_results(
-                                page=self.page,
-                                current_url=self.page.url,
-                                selector=selector,
-                                attribute=attribute,
-                                limit=limit,
-                            )
-
-                if results:
-                    feedback.status = "SUCCESS"
-                    # 判断结果类型：如果是博客内容（包含title或content字段），使用blog_content类型
-                    if results and isinstance(results[0], dict) and ("title" in results[0] or "content" in results[0]):
-                        payload = {
-                            "result_type": "blog_content",
-                            "items": results,
-                        }
-                        # 确保content字段存在且不为空
-                        for item in results:
-                            if isinstance(item, dict):
-                                # 确保content字段存在
-                                if "content" not in item or not item.get("content"):
-                                    # 如果content为空，尝试从其他字段获取
-                                    if "text" in item and item["text"]:
-                                        item["content"] = item["text"]
-                                    elif "ocr_text" in item and item["ocr_text"]:
-                                        item["content"] = item["ocr_text"]
-                                    else:
-                                        # 如果都没有，至少确保content字段存在
-                                        item["content"] = item.get("content", "")
-                                # 确保content是字符串类型
-                                if item.get("content") and not isinstance(item["content"], str):
-                                    item["content"] = str(item["content"])
+                        extraction_instruction_final = _PROMPT_LINKS_FROM_HTML
+                
+                llm_future = self._io_pool.submit(
+                    analyze_html_with_llm,
+                    html_content,
+                    extraction_instruction_final,
+                    max_html_length=50000
+                )
+                
+                # 2. 等待 LLM 响应期间，在当前线程（Playwright 页面只能在创建它的线程中使用）完成高级提取作为备选
+                advanced_results = []
+                try:
+                    if extract_blog_mode or content_type == "blog_content":
+                        # 提取博客正文内容
+                        page_content = extract_page_content(
+                            page=self.page,
+                            current_url=self.page.url,
+                            mode="blog_content",
+                            selector=selector,
+                            include_html=False,
+                        )
+                        if "data" in page_content:
+                            advanced_results = [page_content["data"]]  # 将博客内容作为单个结果项
+                    else:
+                        # 提取链接
+                        page_content = extract_page_content(
+                            page=self.page,
+                            current_url=self.page.url,
+                            mode="links",
+                            selector=selector,
+                            limit=limit,
+                            include_html=False,
+                        )
+                        if "data" in page_content and "links" in page_content["data"]:
+                            advanced_results = page_content["data"]["links"]
+                except Exception as e:
+                    _logger.warning("[BrowserService] Advanced extraction failed: %s", e)
+                
+                llm_result = llm_future.result()
+                if llm_result.get("success") and "data" in llm_result:
+                    data = llm_result["data"]
+                    if "items" in data and data["items"]:
+                        results = data["items"]
+                    elif "links" in data and data["links"]:
+                        results = data["links"]
+                    elif "title" in data or "content" in data:
+                        # LLM返回了博客内容格式
+                        results = [data]  # 将博客内容作为单个结果项
+                
+                # 3. 如果 LLM 提取失败或结果为空，使用高级提取的结果
+                if not results:
+                    _logger.info("[BrowserService] LLM extraction returned no results, using advanced extraction results...")
+                    results = advanced_results
+            
+            elif extract_mode == "llm":
+                # 仅使用 LLM 分析
+                _logger.info("[BrowserService] Using LLM-based HTML analysis for extraction...")
+                html_content = self._get_truncated_html()
+                
+                if extraction_instruction:
+                    llm_result = analyze_html_with_llm(
+                        html_content,
+                        extraction_instruction,
+                        max_html_length=50000
+                    )
+                    if llm_result.get("success") and "data" in llm_result:
+                        data = llm_result["data"]
+                        if "items" in data:
+                            results = data["items"]
+                        elif "links" in data:
+                            results = data["links"]
+                        elif "title" in data or "content" in data:
+                            # LLM返回了博客内容格式
+                            results = [data]
+                else:
+                    if extract_blog_mode or content_type == "blog_content":
+                        extraction_instruction_default = _PROMPT_BLOG_FROM_HTML_BRIEF
+                        llm_result = analyze_html_with_llm(
+                            html_content,
+                            extraction_instruction_default,
+                            max_html_length=50000
+                        )
+                        if llm_result.get("success") and "data" in llm_result:
+                            results = [llm_result["data"]]
                     else:
-                        payload = {
-                            "result_type": "link_list",
-                            "items": results,
-                        }
-                    summary = json.dumps(payload, ensure_ascii=False)
-                    print(f"[BrowserService] extract_data -> Extracted {len(results)} items (type: {payload['result_type']})")
-                    # 显示内容预览
-                    if results and isinstance(results[0], dict) and "content" in results[0]:
-                        content_preview = str(results[0].get("content", ""))[:200]
-                        print(f"[BrowserService] Content preview (first 200 chars): {content_preview}...")
-                    feedback.message = summary
+                        results = extract_with_llm_analysis(
+                            html_content,
+                            task_description=args.get("task_description", "提取页面中所有可跳转的 URL 链接"),
+                            max_html_length=50000
+                        )
+            
+            elif extract_mode == "advanced":
+                # 使用高级提取工具
+                _logger.info("[BrowserService] Using advanced page content extraction...")
+                
+                if extract_blog_mode or content_type == "blog_content":
+                    # 提取博客正文内容
+                    page_content = extract_page_content(
+                        page=self.page,
+                        current_url=self.page.url,
+                        mode="blog_content",
+                        selector=selector,
+                        include_html=False,
+                    )
+                    if "data" in page_content:
+                        results = [page_content["data"]]
                 else:
-                    feedback.status = "FAILED"
-                    feedback.error_code = "NO_DATA_EXTRACTED"
-                    feedback.message = "extract_data: no items extracted from page."
-                    print("[BrowserService] extract_data -> NO DATA EXTRACTED")
-
-            elif action.tool_name == "take_screenshot":
-                # task_topic 主要用于生成有语义的文件名
-                task_topic = action.tool_args.get("task_topic", "web_page")
-                filename = action.tool_args.get("filename")
-                full_page = bool(action.tool_args.get("full_page", True))
-                output_path_arg = action.tool_args.get("output_path")
-                output_dir_arg = action.tool_args.get("output_dir")
-                custom_output_path: Optional[str] = None
+                    # 提取链接
+                    page_content = extract_page_content(
+                        page=self.page,
+                        current_url=self.page.url,
+                        mode="links",
+                        selector=selector,
+                        limit=limit,
+                        include_html=False,
+                    )
+                    if "data" in page_content and "links" in page_content["data"]:
+                        results = page_content["data"]["links"]
+            
+            else:
+                # 使用原有的简单提取逻辑
+                if limit is None:
+                    limit = 10  # 默认限制
+                
+                if extract_blog_mode or content_type == "blog_content":
+                    # 简单模式下也支持提取博客内容
+                    page_content = extract_page_content(
+                        page=self.page,
+                        current_url=self.page.url,
+                        mode="blog_content",
+                        selector=selector,
+                        include_html=False,
+                    )
+                    if "data" in page_content:
+                        results = [page_content["data"]]
+                else:
+                    results = extract_search_results(
+                        page=self.page,
+                        current_url=self.page.url,
+                        selector=selector,
+                        attribute=attribute,
+                        limit=limit,
+                    )
 
-                try:
-                    if output_path_arg:
-                        custom_output_path = resolve_user_path(output_path_arg)
-                    elif output_dir_arg:
-                        resolved_dir = resolve_user_path(output_dir_arg)
-                        os.makedirs(resolved_dir, exist_ok=True)
-                        name = filename
-                        if not name:
-                            ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-                            name = f"{slugify(task_topic)}_{ts}.png"
-                        custom_output_path = os.path.join(resolved_dir, name)
-                except ValueError as exc:
-                    raise ValueError(f"Invalid screenshot output path: {exc}") from exc
-
-                screenshot_path = take_screenshot(
-                    page=self.page,
-                    task_topic=task_topic,
-                    filename=filename,
-                    full_page=full_page,
-                    custom_path=custom_output_path,
-                )
+        if results:
+            feedback.status = "SUCCESS"
+            # 判断结果类型：如果是博客内容（包含title或content字段），使用blog_content类型
+            if results and isinstance(results[0], dict) and ("title" in results[0] or "content" in results[0]):
+                payload = {
+                    "result_type": "blog_content",
+                    "items": results,
+                }
+                # 确保content字段存在且不为空
+                for item in results:
+                    if isinstance(item, dict):
+                        # 确保content字段存在
+                        if "content" not in item or not item.get("content"):
+                            # 如果content为空，尝试从其他字段获取
+                            if "text" in item and item["text"]:
+                                item["content"] = item["text"]
+                            elif "ocr_text" in item and item["ocr_text"]:
+                                item["content"] = item["ocr_text"]
+                            else:
+                                # 如果都没有，至少确保content字段存在
+                                item["content"] = item.get("content", "")
+                        # 确保content是字符串类型
+                        if item.get("content") and not isinstance(item["content"], str):
+                            item["content"] = str(item["content"])
+            else:
+                payload = {
+                    "result_type": "link_list",
+                    "items": results,
+                }
+            summary = _dumps(payload)
+            _logger.info("[BrowserService] extract_data -> Extracted %s items (type: %s)", len(results), payload['result_type'])
+            # 显示内容预览
+            if _DEBUG and results and isinstance(results[0], dict) and "content" in results[0]:
+                content_preview = str(results[0].get("content", ""))[:200]
+                _logger.debug("[BrowserService] Content preview (first 200 chars): %s...", content_preview)
+            feedback.message = summary
+        else:
+            feedback.status = "FAILED"
+            feedback.error_code = "NO_DATA_EXTRACTED"
+            feedback.message = "extract_data: no items extracted from page."
+            _logger.info("[BrowserService] extract_data -> NO DATA EXTRACTED")
 
-                feedback.status = "SUCCESS"
-                feedback.message = f"Screenshot saved to: {screenshot_path}"
+    def _tool_take_screenshot(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """截取当前页面并保存。"""
+        args = action.tool_args
+        # task_topic 主要用于生成有语义的文件名
+        task_topic = args.get("task_topic", "web_page")
+        filename = args.get("filename")
+        full_page = bool(args.get("full_page", True))
+        output_path_arg = args.get("output_path")
+        output_dir_arg = args.get("output_dir")
+        custom_output_path: Optional[str] = None
 
-            elif action.tool_name == "download_page":
-                task_topic = action.tool_args.get("task_topic", "web_page")
-                path = save_current_page_html(self.page, task_topic=task_topic)
-                feedback.status = "SUCCESS"
-                feedback.message = f"Page HTML saved to: {path}"
+        try:
+            if output_path_arg:
+                custom_output_path = resolve_user_path(output_path_arg)
+            elif output_dir_arg:
+                resolved_dir = resolve_user_path(output_dir_arg)
+                self._ensure_dir(resolved_dir)
+                name = filename
+                if not name:
+                    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    name = f"{slugify(task_topic)}_{ts}.png"
+                custom_output_path = os.path.join(resolved_dir, name)
+        except ValueError as exc:
+            raise ValueError(f"Invalid screenshot output path: {exc}") from exc
 
-            elif action.tool_name == "download_link":
-                task_topic = action.tool_args.get("task_topic", "download")
-                url = action.tool_args.get("url")
-                selector = None
-                if not url and any(k in action.tool_args for k in ("selector", "xpath", "text_content", "container_selector")):
-                    selector = self._get_selector(action.tool_args)
-
-                path = download_from_link(
-                    page=self.page,
-                    task_topic=task_topic,
-                    url=url,
-                    selector=selector,
-                )
-                feedback.status = "SUCCESS"
-                feedback.message = f"Downloaded content saved to: {path}"
-
-            elif action.tool_name == "click_nth":
-                selector = self._get_selector(action.tool_args)
-                index = int(action.tool_args.get("index", 0))
-                timeout_ms = int(action.tool_args.get("timeout_ms", timeout_ms))
-
-                print(f"    -> Clicking element #{index} for selector: {selector}")
-                click_nth_match(
-                    page=self.page,
-                    selector=selector,
-                    index=index,
-                    timeout_ms=timeout_ms,
-                )
+        data = self._capture_screenshot_bytes(full_page)
+        digest = hashlib.sha256(data).digest()
+        last = self._last_screenshot
+        # 未指定输出位置且画面与上一次截图完全相同时，直接复用上一次的文件
+        if (
+            not filename and not custom_output_path
+            and last is not None and last[0] == digest and os.path.exists(last[1])
+        ):
+            feedback.status = "SUCCESS"
+            feedback.message = f"Screenshot unchanged; reusing {last[1]}"
+        else:
+            screenshot_path = take_screenshot(
+                page=self.page,
+                task_topic=task_topic,
+                filename=filename,
+                full_page=full_page,
+                custom_path=custom_output_path,
+                # 写盘与随后的交互元素扫描并行，下一个动作开始前再等待写完
+                write_in_background=True,
+                data=data,
+            )
+            self._last_screenshot = (digest, screenshot_path)
 
-            elif action.tool_name == "find_link_by_text":
-                keyword = action.tool_args.get("keyword")
-                limit = int(action.tool_args.get("limit", 5))
+            feedback.status = "SUCCESS"
+            feedback.message = f"Screenshot saved to: {screenshot_path}"
 
-                if not keyword:
-                    raise ValueError("find_link_by_text requires 'keyword' in tool_args.")
+    def _tool_download_page(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """保存当前页面的 HTML。"""
+        task_topic = action.tool_args.get("task_topic", "web_page")
+        path = save_current_page_html(self.page, task_topic=task_topic)
+        feedback.status = "SUCCESS"
+        feedback.message = f"Page HTML saved to: {path}"
 
-                matches = find_link_by_text(
-                    page=self.page,
-                    keyword=keyword,
-                    limit=limit,
-                )
+    def _tool_download_link(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """下载链接指向的内容。"""
+        args = action.tool_args
+        task_topic = args.get("task_topic", "download")
+        url = args.get("url")
+        selector = None
+        if not url and any(k in args for k in ("selector", "xpath", "text_content", "container_selector")):
+            selector = self._get_selector(args)
 
-                feedback.status = "SUCCESS"
-                feedback.message = f"Found {len(matches)} links: {matches}"
+        path = download_from_link(
+            page=self.page,
+            task_topic=task_topic,
+            url=url,
+            selector=selector,
+        )
+        feedback.status = "SUCCESS"
+        feedback.message = f"Downloaded content saved to: {path}"
 
-            elif action.tool_name == "click_element":
-                selector = self._get_selector(action.tool_args)
-                print(f"    -> Clicking target: {selector}")
-                
-                timeout_ms = action.execution_timeout_seconds * 1000
+    def _tool_click_nth(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """点击选择器匹配到的第 N 个元素。"""
+        args = action.tool_args
+        selector = self._get_selector(args)
+        index = int(args.get("index", 0))
+        timeout_ms = int(args.get("timeout_ms", timeout_ms))
 
-                # 🚀 工业级修复：使用 Playwright 的 expect_navigation 来处理点击导致的页面跳转。
-                # 这样可以可靠地等待跳转完成，或在超时时抛出 TimeoutError。
-                
-                # 1. 确保元素可见
-                self.page.wait_for_selector(selector, state="visible", timeout=timeout_ms)
-                
-                # 2. 预期导航发生并执行点击
-                # 这一步会等待 URL 变化或页面加载完成。
-                # 如果点击不导致导航，expect_navigation 会超时，所以用 try-except 处理
-                try:
-                    with self.page.expect_navigation(timeout=timeout_ms):
-                        self.page.click(selector, timeout=timeout_ms)
-                except TimeoutError:
-                    # 点击可能不导致导航（如按钮触发 AJAX），直接点击即可
-                    self.page.click(selector, timeout=timeout_ms)
-                
-                # 点击后可能跳转到登录页，做一次检测
-                self._maybe_wait_for_manual_login()
+        _logger.info("    -> Clicking element #%s for selector: %s", index, selector)
+        prev_url = self.page.url
+        click_nth_match(
+            page=self.page,
+            selector=selector,
+            index=index,
+            timeout_ms=timeout_ms,
+        )
+        # 点击结果项通常会跳转页面：与 click_element 相同，只有 URL 变化时才等待新页面加载
+        try:
+            self.page.wait_for_url(lambda url: url != prev_url, wait_until="commit", timeout=_CLICK_NAVIGATION_WAIT_MS)
+            self._wait_for_page_load()
+        except TimeoutError:
+            pass
 
-            elif action.tool_name == "open_notepad":
-                self._launch_notepad(action, feedback)
+    def _tool_find_link_by_text(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """按文本查找页面上的链接。"""
+        args = action.tool_args
+        keyword = args.get("keyword")
+        limit = int(args.get("limit", 5))
 
-            elif action.tool_name == "scroll":
-                direction = action.tool_args.get("direction", "down")
-                scroll_amount = action.tool_args.get("amount", "window.innerHeight")
-                
-                js_scroll = f"window.scrollBy(0, {scroll_amount})" if direction == "down" else f"window.scrollBy(0, -{scroll_amount})"
-                self.page.evaluate(js_scroll)
-            
-            elif action.tool_name == "wait":
-                duration = action.tool_args.get("duration", 2)
-                time.sleep(duration)
-
-            elif action.tool_name == "extract_text_from_image":
-                # OCR 文字识别工具
-                image_path = action.tool_args.get("image_path")
-                languages = action.tool_args.get("languages", ["ch_sim", "en"])
-                detail = int(action.tool_args.get("detail", 0))
-                
-                if not image_path:
-                    raise ValueError("extract_text_from_image requires 'image_path' in tool_args")
-                
-                # 解析路径
-                try:
-                    resolved_path = resolve_user_path(image_path)
-                except ValueError:
-                    resolved_path = os.path.abspath(image_path)
-                
-                result = extract_text_from_image(
-                    image_path=resolved_path,
-                    languages=languages if isinstance(languages, list) else ["ch_sim", "en"],
-                    detail=detail,
-                )
-                
-                if result.get("success"):
-                    feedback.status = "SUCCESS"
-                    payload = {
-                        "result_type": "ocr_text",
-                        "text": result.get("text", ""),
-                        "details": result.get("details", []),
-                    }
-                    summary = json.dumps(payload, ensure_ascii=False)
-                    feedback.message = summary
-                    print(f"[BrowserService] OCR extracted {len(result.get('text', ''))} characters from image")
-                else:
-                    feedback.status = "FAILED"
-                    feedback.error_code = "OCR_EXTRACTION_FAILED"
-                    feedback.message = f"OCR extraction failed: {result.get('error', 'Unknown error')}"
-                    raise Error(feedback.message)
-
-            elif action.tool_name == "analyze_ocr_text":
-                # OCR 文本分析工具（使用 LLM 分析 OCR 结果）
-                ocr_text = action.tool_args.get("ocr_text")
-                analysis_instruction = action.tool_args.get("analysis_instruction")
-                analysis_type = action.tool_args.get("analysis_type", "custom")  # custom, keywords, summary
-                
-                if not ocr_text:
-                    raise ValueError("analyze_ocr_text requires 'ocr_text' in tool_args")
-                
-                if analysis_type == "keywords":
-                    max_keywords = int(action.tool_args.get("max_keywords", 10))
-                    language = action.tool_args.get("language", "zh")
-                    result = extract_keywords_from_ocr(ocr_text, max_keywords, language)
-                elif analysis_type == "summary":
-                    max_length = int(action.tool_args.get("max_length", 200))
-                    result = summarize_ocr_text(ocr_text, max_length)
-                else:
-                    # 自定义分析
-                    if not analysis_instruction:
-                        raise ValueError("analyze_ocr_text with analysis_type='custom' requires 'analysis_instruction'")
-                    result = analyze_ocr_text_with_llm(ocr_text, analysis_instruction)
-                
-                if result.get("success"):
-                    feedback.status = "SUCCESS"
-                    payload = {
-                        "result_type": "ocr_analysis",
-                        "analysis_type": analysis_type,
-                        "data": result.get("data", {}),
-                    }
-                    summary = json.dumps(payload, ensure_ascii=False)
-                    feedback.message = summary
-                    print(f"[BrowserService] OCR text analysis completed (type: {analysis_type})")
-                else:
-                    feedback.status = "FAILED"
-                    feedback.error_code = "OCR_ANALYSIS_FAILED"
-                    feedback.message = f"OCR text analysis failed: {result.get('error', 'Unknown error')}"
-                    raise Error(feedback.message)
-
-            elif action.tool_name == "extract_text_from_screenshot":
-                # 从截图提取文字（OCR）
-                screenshot_path = action.tool_args.get("screenshot_path")
-                languages = action.tool_args.get("languages", ["ch_sim", "en"])
-                detail = int(action.tool_args.get("detail", 0))
-                analyze_with_llm = bool(action.tool_args.get("analyze_with_llm", False))
-                analysis_instruction = action.tool_args.get("analysis_instruction", "")
-                
-                if not screenshot_path:
-                    raise ValueError("extract_text_from_screenshot requires 'screenshot_path' in tool_args")
-                
-                # 解析路径
-                try:
-                    resolved_path = resolve_user_path(screenshot_path)
-                except ValueError:
-                    resolved_path = os.path.abspath(screenshot_path)
-                
-                # 执行 OCR
-                ocr_result = extract_text_from_screenshot(
-                    screenshot_path=resolved_path,
-                    languages=languages if isinstance(languages, list) else ["ch_sim", "en"],
-                    detail=detail,
-                )
-                
-                if not ocr_result.get("success"):
-                    feedback.status = "FAILED"
-                    feedback.error_code = "OCR_EXTRACTION_FAILED"
-                    feedback.message = f"OCR extraction failed: {ocr_result.get('error', 'Unknown error')}"
-                    raise Error(feedback.message)
-                
-                ocr_text = ocr_result.get("text", "")
-                
-                # 如果需要使用 LLM 分析
-                if analyze_with_llm:
-                    if not analysis_instruction:
-                        analysis_instruction = "提取文本中的关键词和主要内容摘要"
-                    
-                    llm_result = analyze_ocr_text_with_llm(ocr_text, analysis_instruction)
-                    
-                    if llm_result.get("success"):
-                        feedback.status = "SUCCESS"
-                        payload = {
-                            "result_type": "ocr_with_analysis",
-                            "ocr_text": ocr_text,
-                            "analysis": llm_result.get("data", {}),
-                        }
-                        summary = json.dumps(payload, ensure_ascii=False)
-                        feedback.message = summary
-                        print(f"[BrowserService] OCR + LLM analysis completed")
-                    else:
-                        # OCR 成功但 LLM 分析失败，至少返回 OCR 结果
-                        feedback.status = "SUCCESS"
-                        payload = {
-                            "result_type": "ocr_text",
-                            "text": ocr_text,
-                            "analysis_error": llm_result.get("error", "Unknown error"),
-                        }
-                        summary = json.dumps(payload, ensure_ascii=False)
-                        feedback.message = summary
-                        print(f"[BrowserService] OCR completed, but LLM analysis failed")
-                else:
-                    # 只返回 OCR 结果
-                    feedback.status = "SUCCESS"
-                    payload = {
-                        "result_type": "ocr_text",
-                        "text": ocr_text,
-                        "details": ocr_result.get("details", []),
-                    }
-                    summary = json.dumps(payload, ensure_ascii=False)
-                    feedback.message = summary
-                    print(f"[BrowserService] OCR extracted {len(ocr_text)} characters from screenshot")
+        if not keyword:
+            raise ValueError("find_link_by_text requires 'keyword' in tool_args.")
 
-            else:
-                raise ValueError(f"Unsupported tool: {action.tool_name}")
+        matches = find_link_by_text(
+            page=self.page,
+            keyword=keyword,
+            limit=limit,
+        )
+
+        feedback.status = "SUCCESS"
+        feedback.message = f"Found {len(matches)} links: {matches}"
+
+    def _tool_click_element(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """点击目标元素，并处理可能发生的页面跳转。"""
+        selector = self._get_selector(action.tool_args)
+        _logger.info("    -> Clicking target: %s", selector)
+
+        # 1. locator.click 自带可操作性检查（可见、稳定、可接收事件），无需先单独等待可见；
+        # 只点击一次，避免对不跳转的按钮（如提交表单、AJAX 切换）重复触发
+        prev_url = self.page.url
+        self._locator(selector).click(timeout=timeout_ms)
+
+        # 2. 点击后短暂观察 URL 是否变化：变化说明发生了跳转，再等待新页面加载；
+        # 不跳转的点击最多只多等 500ms，而不是整个动作超时
+        try:
+            self.page.wait_for_url(lambda url: url != prev_url, wait_until="commit", timeout=_CLICK_NAVIGATION_WAIT_MS)
+            self._wait_for_page_load()
+        except TimeoutError:
+            pass
+        # 点击后可能跳转到登录页：由动作结束后的 _settle_page 统一检测一次
 
-            # 等待网络空闲
+    def _tool_open_notepad(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """启动记事本并写入内容。"""
+        self._launch_notepad(action, feedback)
+
+    def _tool_scroll(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """滚动页面。"""
+        args = action.tool_args
+        direction = args.get("direction", "down")
+        scroll_amount = args.get("amount", "window.innerHeight")
+        sign = 1 if direction == "down" else -1
+
+        if scroll_amount == "window.innerHeight":
+            # 默认滚动一屏，使用预先写好的脚本
+            self.page.evaluate(_SCROLL_PAGE_JS[sign])
+        elif isinstance(scroll_amount, (int, float)) or str(scroll_amount).lstrip("-").isdigit():
+            # 数值作为参数传入，脚本文本保持不变
+            self.page.evaluate(_SCROLL_BY_JS, sign * int(scroll_amount))
+        else:
+            # 其他 JS 表达式（如 "document.body.scrollHeight"）
+            js_scroll = f"window.scrollBy(0, {scroll_amount})" if sign > 0 else f"window.scrollBy(0, -{scroll_amount})"
+            self.page.evaluate(js_scroll)
+
+    def _tool_wait(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """
+        等待页面稳定（加载完成且没有 aria-busy 区域），最多等待 duration 秒；
+        页面已经稳定时约 100ms 内返回。fixed=True 时按原样固定等待 duration 秒。
+        """
+        args = action.tool_args
+        duration_ms = float(args.get("duration", 2)) * 1000
+        if duration_ms <= 0:
+            # Playwright 的 timeout=0 表示无限等待，非正时长直接返回
+            return
+        if args.get("fixed"):
+            self.page.wait_for_timeout(duration_ms)
+            return
+        try:
+            self.page.wait_for_function(_PAGE_SETTLED_JS, timeout=duration_ms, polling=100)
+        except TimeoutError:
+            pass
+
+    def _tool_extract_text_from_image(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """对本地图片执行 OCR 文字识别。"""
+        args = action.tool_args
+        # OCR 文字识别工具
+        image_path = args.get("image_path")
+        languages = args.get("languages", ["ch_sim", "en"])
+        languages = languages if isinstance(languages, list) else ["ch_sim", "en"]
+        detail = int(args.get("detail", 0))
+        batch_size = int(args["batch_size"]) if args.get("batch_size") else None
+        
+        if not image_path:
+            raise ValueError("extract_text_from_image requires 'image_path' in tool_args")
+        
+        # 解析路径
+        def _resolve(path: str) -> str:
             try:
-                self.page.wait_for_load_state("networkidle", timeout=3000)
-            except TimeoutError:
-                pass 
+                return resolve_user_path(path)
+            except ValueError:
+                return os.path.abspath(path)
+        
+        if isinstance(image_path, list):
+            # 多张图片：一次批量识别，尺寸相同的图片共享前向计算
+            batch_results = batch_extract_text_from_images(
+                [_resolve(path) for path in image_path], languages, detail, batch_size
+            )
+            if not any(item.get("success") for item in batch_results):
+                errors = "; ".join(str(item.get("error", "Unknown error")) for item in batch_results)
+                feedback.status = "FAILED"
+                feedback.error_code = "OCR_EXTRACTION_FAILED"
+                feedback.message = f"OCR extraction failed: {errors}"
+                raise Error(feedback.message)
+            feedback.status = "SUCCESS"
+            feedback.message = _dumps({
+                "result_type": "ocr_text_batch",
+                "results": [
+                    {
+                        "image_path": item["image_path"],
+                        "text": item.get("text", ""),
+                        "details": item.get("details", []),
+                        "error": item.get("error"),
+                    }
+                    for item in batch_results
+                ],
+            })
+            _logger.info("[BrowserService] OCR extracted text from %s images", len(batch_results))
+            return
+        
+        result = extract_text_from_image(
+            image_path=_resolve(image_path),
+            languages=languages,
+            detail=detail,
+            batch_size=batch_size,
+        )
+        
+        if result.get("success"):
+            feedback.status = "SUCCESS"
+            payload = {
+                "result_type": "ocr_text",
+                "text": result.get("text", ""),
+                "details": result.get("details", []),
+            }
+            summary = _dumps(payload)
+            feedback.message = summary
+            _logger.info("[BrowserService] OCR extracted %s characters from image", len(result.get('text', '')))
+        else:
+            feedback.status = "FAILED"
+            feedback.error_code = "OCR_EXTRACTION_FAILED"
+            feedback.message = f"OCR extraction failed: {result.get('error', 'Unknown error')}"
+            raise Error(feedback.message)
+
+    def _tool_analyze_ocr_text(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """使用 LLM 分析 OCR 文本。"""
+        args = action.tool_args
+        # OCR 文本分析工具（使用 LLM 分析 OCR 结果）
+        ocr_text = args.get("ocr_text")
+        analysis_instruction = args.get("analysis_instruction")
+        analysis_type = args.get("analysis_type", "custom")  # custom, keywords, summary
+        
+        if not ocr_text:
+            raise ValueError("analyze_ocr_text requires 'ocr_text' in tool_args")
+        
+        if analysis_type == "keywords":
+            max_keywords = int(args.get("max_keywords", 10))
+            language = args.get("language", "zh")
+            result = extract_keywords_from_ocr(ocr_text, max_keywords, language)
+        elif analysis_type == "summary":
+            max_length = int(args.get("max_length", 200))
+            result = summarize_ocr_text(ocr_text, max_length)
+        else:
+            # 自定义分析
+            if not analysis_instruction:
+                raise ValueError("analyze_ocr_text with analysis_type='custom' requires 'analysis_instruction'")
+            result = analyze_ocr_text_with_llm(ocr_text, analysis_instruction)
+        
+        if result.get("success"):
+            feedback.status = "SUCCESS"
+            payload = {
+                "result_type": "ocr_analysis",
+                "analysis_type": analysis_type,
+                "data": result.get("data", {}),
+            }
+            summary = _dumps(payload)
+            feedback.message = summary
+            _logger.info("[BrowserService] OCR text analysis completed (type: %s)", analysis_type)
+        else:
+            feedback.status = "FAILED"
+            feedback.error_code = "OCR_ANALYSIS_FAILED"
+            feedback.message = f"OCR text analysis failed: {result.get('error', 'Unknown error')}"
+            raise Error(feedback.message)
+
+    def _tool_extract_text_from_screenshot(self, action: DecisionAction, feedback: ActionFeedback, timeout_ms: int) -> None:
+        """对截图执行 OCR，可选使用 LLM 分析识别结果。"""
+        args = action.tool_args
+        # 从截图提取文字（OCR）
+        screenshot_path = args.get("screenshot_path")
+        languages = args.get("languages", ["ch_sim", "en"])
+        detail = int(args.get("detail", 0))
+        analyze_with_llm = bool(args.get("analyze_with_llm", False))
+        analysis_instruction = args.get("analysis_instruction", "")
+        
+        if not screenshot_path:
+            raise ValueError("extract_text_from_screenshot requires 'screenshot_path' in tool_args")
+        
+        # 解析路径
+        try:
+            resolved_path = resolve_user_path(screenshot_path)
+        except ValueError:
+            resolved_path = os.path.abspath(screenshot_path)
+        
+        # 执行 OCR
+        ocr_result = extract_text_from_screenshot(
+            screenshot_path=resolved_path,
+            languages=languages if isinstance(languages, list) else ["ch_sim", "en"],
+            detail=detail,
+            batch_size=int(args["batch_size"]) if args.get("batch_size") else None,
+        )
+        
+        if not ocr_result.get("success"):
+            feedback.status = "FAILED"
+            feedback.error_code = "OCR_EXTRACTION_FAILED"
+            feedback.message = f"OCR extraction failed: {ocr_result.get('error', 'Unknown error')}"
+            raise Error(feedback.message)
+        
+        ocr_text = ocr_result.get("text", "")
+        
+        # 如果需要使用 LLM 分析
+        if analyze_with_llm:
+            if not analysis_instruction:
+                analysis_instruction = "提取文本中的关键词和主要内容摘要"
+            
+            llm_result = analyze_ocr_text_with_llm(ocr_text, analysis_instruction)
             
-            # 操作完成后，检测是否出现了登录界面（包括弹窗）
-            # 这可以在页面加载或 AJAX 操作完成后捕获突然出现的登录弹窗
-            self._maybe_wait_for_manual_login() 
+            if llm_result.get("success"):
+                feedback.status = "SUCCESS"
+                payload = {
+                    "result_type": "ocr_with_analysis",
+                    "ocr_text": ocr_text,
+                    "analysis": llm_result.get("data", {}),
+                }
+                summary = _dumps(payload)
+                feedback.message = summary
+                _logger.info("[BrowserService] OCR + LLM analysis completed")
+            else:
+                # OCR 成功但 LLM 分析失败，至少返回 OCR 结果
+                feedback.status = "SUCCESS"
+                payload = {
+                    "result_type": "ocr_text",
+                    "text": ocr_text,
+                    "analysis_error": llm_result.get("error", "Unknown error"),
+                }
+                summary = _dumps(payload)
+                feedback.message = summary
+                _logger.warning("[BrowserService] OCR completed, but LLM analysis failed")
+        else:
+            # 只返回 OCR 结果
+            feedback.status = "SUCCESS"
+            payload = {
+                "result_type": "ocr_text",
+                "text": ocr_text,
+                "details": ocr_result.get("details", []),
+            }
+            summary = _dumps(payload)
+            feedback.message = summary
+            _logger.info("[BrowserService] OCR extracted %s characters from screenshot", len(ocr_text))
+
+    def _wait_for_page_load(self, timeout_ms: int = 3000) -> None:
+        """
+        等待页面加载完成（document.readyState 为 complete），仅在会导致页面跳转的分支中调用。
+        页面内每 100ms 轮询一次，已加载完成时立即返回；不使用 networkidle，
+        长轮询/广告请求不断的页面上它总会耗满超时。
+        """
+        try:
+            self.page.wait_for_function(_PAGE_LOADED_JS, timeout=timeout_ms, polling=100)
+        except TimeoutError:
+            pass
+
+    def _settle_page(self) -> None:
+        """动作完成后检测是否出现了登录界面（页面加载等待已下放到会跳转页面的分支中）。"""
+        # 操作完成后，检测是否出现了登录界面（包括弹窗）
+        # 这可以在页面加载或 AJAX 操作完成后捕获突然出现的登录弹窗
+        self._maybe_wait_for_manual_login() 
+
+    def _execute_guarded(self, action: DecisionAction, feedback: ActionFeedback, settle: bool = True) -> bool:
+        """
+        执行动作并把异常记录到 feedback 中。
+        :param settle: 是否在动作后等待页面稳定（批量执行时只在最后一步等待）。
+        :return: 动作是否成功执行。
+        """
+        cache_key = self._action_cache_key(action)
+        if cache_key is None:
+            # 非只读操作可能改变页面，之前缓存的结果全部作废
+            self._action_cache.clear()
+        else:
+            cached = self._lookup_action_cache(cache_key)
+            if cached is not None:
+                _logger.info("[BrowserService] Action cache hit: %s", action.tool_name)
+                feedback.status = cached.status
+                feedback.error_code = cached.error_code
+                feedback.message = cached.message
+                return True
+
+        try:
+            self._run_action(action, feedback, action.execution_timeout_seconds * 1000)
+            if settle:
+                self._settle_page()
+            if cache_key is not None and feedback.status == "SUCCESS":
+                self._store_action_cache(cache_key, feedback)
+            return True
 
         except Error as e:
             # 捕获所有 Playwright 错误
-            feedback.status = "FAILED"
-            feedback.error_code = "PLAYWRIGHT_ERROR"
-            feedback.message = str(e)
-            print(f"[BrowserService] Action Failed: {e}")
-            
+            self._record_failure(feedback, "PLAYWRIGHT_ERROR", e)
+
         except Exception as e:
             # 捕获其他 Python 错误
-            feedback.status = "FAILED"
-            feedback.error_code = "EXECUTION_ERROR"
-            feedback.message = str(e)
-            print(f"[BrowserService] Action Failed: {e}")
+            self._record_failure(feedback, "EXECUTION_ERROR", e)
 
-        # 2. 构造 WebObservation
+        return False
+
+    @staticmethod
+    def _record_failure(feedback: ActionFeedback, error_code: str, exc: Exception) -> None:
+        """
+        把异常记录到 feedback 中。工具在抛出异常前已写入失败反馈（如 NOTEPAD_UNSUPPORTED_PLATFORM）时
+        保留其错误码和消息，只有未标记失败时才使用通用错误码。
+        """
+        _logger.error("[BrowserService] Action Failed: %s", exc)
+        if feedback.status == "FAILED":
+            return
+        feedback.status = "FAILED"
+        feedback.error_code = error_code
+        feedback.message = str(exc)
+
+    def _build_observation(self, start_time: float, feedback: ActionFeedback, include_elements: bool = True) -> WebObservation:
+        """构造 WebObservation。"""
         end_time = time.time()
         load_time_ms = int((end_time - start_time) * 1000)
-        
+        http_status, key_elements = self._observe_page(include_elements)
+
         return WebObservation(
-            observation_timestamp_utc=str(time.time()),
             current_url=self.page.url,
-            http_status_code=self._last_http_status,
+            http_status_code=http_status,
             page_load_time_ms=load_time_ms if feedback.status == "SUCCESS" else 0,
             is_authenticated=False, 
-            key_elements=self._extract_interactive_elements(), 
+            key_elements=key_elements,
             screenshot_available=False, 
             last_action_feedback=feedback,
             memory_context="Browser state captured."
-        )
\ No newline at end of file
+        )
+
+    def execute_action(self, action: DecisionAction) -> WebObservation:
+        """
+        核心入口：执行动作 -> 等待页面稳定 -> 提取观测数据
+        """
+        start_time = time.time()
+        feedback = ActionFeedback(status="SUCCESS", error_code="0", message="Action executed.")
+
+        # 1. 执行具体动作
+        succeeded = self._execute_guarded(action, feedback)
+
+        # 2. 构造 WebObservation：仅在页面可能变化或动作失败（供纠错规划参考）时扫描交互元素
+        include_elements = action.tool_args.get("include_elements", action.tool_name in _ELEMENT_OBSERVING_TOOLS)
+        return self._build_observation(start_time, feedback, include_elements=bool(include_elements) or not succeeded)
+
+    def execute_actions(self, actions: List[DecisionAction], snapshot_when: Optional[str] = "final") -> WebObservation:
+        """
+        批量执行一组动作，只在批次末尾等待一次页面稳定并构造一次观测，
+        省去逐个动作的登录检测与元素扫描。
+
+        :param actions: 按顺序执行的动作列表；任一动作失败即终止批次。
+        :param snapshot_when: "final" 时在批次结束后提取交互元素，其他值（如 "never"）返回空列表。
+        :return: 批次结束后的 WebObservation，last_action_feedback 为最后执行的动作反馈。
+        """
+        start_time = time.time()
+        feedback = ActionFeedback(status="SUCCESS", error_code="0", message="No actions executed.")
+
+        for idx, action in enumerate(actions):
+            feedback = ActionFeedback(status="SUCCESS", error_code="0", message="Action executed.")
+            is_last = idx == len(actions) - 1
+            if not self._execute_guarded(action, feedback, settle=is_last):
+                feedback.message = f"Batch step #{idx} ({action.tool_name}) failed: {feedback.message}"
+                break
+
+        return self._build_observation(start_time, feedback, include_elements=snapshot_when == "final")
\ No newline at end of file
@@ -99,7 +99,7 @@ class LLMAdapter:
             "   路径支持绝对路径（如 D:\\Desktop\\file.txt）和相对路径，也支持'桌面'、'desktop'等中文描述。"
             "   删除操作和覆盖写入操作需要用户确认（项目内 temp/ 和 logs/ 目录的删除除外）。"
             "11. 【OCR 图像文字识别工具】当需要从图片或截图中提取文字内容时，可以使用以下工具："
-            "   - extract_text_from_image: 从图片文件中提取文字（OCR），tool_args 包含 image_path(字符串，图片路径)、"
+            "   - extract_text_from_image: 从图片文件中提取文字（OCR），tool_args 包含 image_path(字符串，图片路径；多张图片时传路径列表，一次批量识别)、"
             "     languages(列表，可选，默认['ch_sim', 'en']，支持中文和英文)、detail(整数，可选，0=只返回文本，1=返回详细信息)。"
             "   - extract_text_from_screenshot: 从截图中提取文字（OCR），tool_args 包含 screenshot_path(字符串，截图路径)、"
             "     languages(列表，可选)、detail(整数，可选)、analyze_with_llm(布尔，可选，是否使用LLM分析OCR结果)、"
@@ -6,8 +6,9 @@
 - 通过链接 URL 或页面元素下载资源内容（download_link）
 """
 
-import os
+import codecs
 import mimetypes
+import os
 from typing import Optional
 
 import requests
@@ -15,6 +16,9 @@ from playwright.sync_api import Page
 
 from backend.src.utils.path_utils import build_temp_file_path
 
+# 保存 HTML 时每次编码写入的字符数
+_WRITE_CHUNK_CHARS = 1 << 20
+
 
 def save_current_page_html(page: Page, task_topic: str) -> str:
     """
@@ -22,8 +26,13 @@ def save_current_page_html(page: Page, task_topic: str) -> str:
     """
     html = page.content()
     path = build_temp_file_path("downloads", task_topic=task_topic, extension=".html")
-    with open(path, "w", encoding="utf-8-sig") as f:
-        f.write(html)
+    # 分块编码写入，避免大页面同时持有完整的 str 和完整的 bytes 两份副本
+    with open(path, "wb", buffering=_WRITE_CHUNK_CHARS) as f:
+        f.write(codecs.BOM_UTF8)
+        f.writelines(
+            html[start:start + _WRITE_CHUNK_CHARS].encode("utf-8", "replace")
+            for start in range(0, len(html), _WRITE_CHUNK_CHARS)
+        )
     return os.path.abspath(path)
 
 
@@ -9,6 +9,24 @@ from typing import List, Dict
 from playwright.sync_api import Page
 
 
+# 关键字匹配在页面内完成（等价于 XPath contains(normalize-space(string(.)), keyword)），
+# 只把命中的前 limit 个链接传回，避免逐个元素 inner_text/get_attribute 的往返
+_FIND_LINKS_JS = """
+([keyword, limit]) => {
+    const results = [];
+    for (const el of document.querySelectorAll('a')) {
+        if (results.length >= limit) break;
+        const normalized = (el.textContent || '').replace(/\\s+/g, ' ').trim();
+        if (!normalized.includes(keyword)) continue;
+        const text = (el.innerText || '').trim();
+        const href = el.getAttribute('href') || '';
+        if (text || href) results.push({ text, href });
+    }
+    return results;
+}
+"""
+
+
 def find_link_by_text(
     page: Page,
     keyword: str,
@@ -19,20 +37,7 @@ def find_link_by_text(
 
     :return: 形如 [{'text': '链接文本', 'href': 'https://...'}, ...] 的列表。
     """
-    results: List[Dict[str, str]] = []
-
-    # 使用 contains(text) 的 XPath 做一个粗略匹配
-    xpath = f"//a[contains(normalize-space(string(.)), '{keyword}')]"
-    elements = page.locator(f"xpath={xpath}").all()
-
-    for i, el in enumerate(elements):
-        if i >= limit:
-            break
-        text = el.inner_text().strip()
-        href = el.get_attribute("href") or ""
-        if text or href:
-            results.append({"text": text, "href": href})
-
-    return results
+    # 关键字作为参数传入，不再拼接进 XPath，包含引号时也能正确匹配
+    return page.evaluate(_FIND_LINKS_JS, [keyword, limit])
 
 
@@ -5,6 +5,7 @@
 """
 
 import os
+import re
 import requests
 import json
 from typing import Dict, Any, Optional, List
@@ -12,6 +13,41 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# 对 LLM 分析没有价值、却占用大量 token 的标签
+_NOISE_TAGS = ["script", "style", "svg", "noscript", "iframe", "link", "template"]
+_NOISE_BLOCK_RE = re.compile(
+    r"<(script|style|svg|noscript|iframe|template)\b[^>]*>.*?</\1\s*>|<link\b[^>]*>",
+    re.S | re.I,
+)
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+# 只影响展示/交互的属性（class、style、data-*、aria-*、内联事件），对内容提取没有帮助
+_NOISY_ATTR_RE = re.compile(
+    r"""\s(?:class|style|data-[\w-]+|aria-[\w-]+|on\w+)\s*=\s*(?:"[^"]*"|'[^']*'|[^\s>]+)""",
+    re.I,
+)
+_WHITESPACE_RE = re.compile(r"\s{2,}")
+
+# selectolax（基于 C 的 Lexbor 解析器）可选：不可用时使用预编译正则
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+
+def _strip_for_llm(html_content: str) -> str:
+    """
+    去除脚本、样式、内联 SVG 等噪声标签、注释与展示类属性，并折叠连续空白，减少发送给 LLM 的 token。
+    """
+    if HTMLParser is not None:
+        tree = HTMLParser(html_content)
+        tree.strip_tags(_NOISE_TAGS)
+        html_content = tree.html or ""
+    else:
+        html_content = _NOISE_BLOCK_RE.sub("", html_content)
+    html_content = _COMMENT_RE.sub("", html_content)
+    html_content = _NOISY_ATTR_RE.sub("", html_content)
+    return _WHITESPACE_RE.sub(" ", html_content)
+
 
 def analyze_html_with_llm(
     html_content: str,
@@ -36,7 +72,8 @@ def analyze_html_with_llm(
             "error": "LLM_API_KEY not configured"
         }
     
-    # 截断过长的 HTML
+    # 先清理噪声再截断，截断预算留给有效内容
+    html_content = _strip_for_llm(html_content)
     if len(html_content) > max_html_length:
         html_content = html_content[:max_html_length]
         print(f"[llm_html_analyzer] HTML content truncated to {max_html_length} characters")
@@ -15,6 +15,92 @@ import json
 from playwright.sync_api import Page, TimeoutError
 
 
+# 在页面内按顺序尝试多个选择器，返回第一个非空文本（长度不足 minLength 的跳过），
+# 避免 Python 侧逐个选择器 locator().count() + inner_text() 的往返
+_FIRST_TEXT_JS = """
+(root, [selectors, attr, minLength]) => {
+    for (const sel of selectors) {
+        let el = null;
+        try {
+            el = root.querySelector(sel);
+        } catch (e) {
+            continue;
+        }
+        if (!el) continue;
+        const text = ((attr && el.getAttribute(attr)) || el.innerText || '').trim();
+        if (text && text.length >= minLength) return text;
+    }
+    return '';
+}
+"""
+
+
+# 以下脚本配合 eval_on_selector_all / evaluate_all 使用：一次调用取回全部匹配元素的字段，
+# 代替 count() + nth(i).inner_text()/get_attribute() 的逐元素往返。limit 为空时取全部。
+_LINKS_JS = """
+(els, limit) => els.slice(0, limit || els.length).map(el => [
+    (el.innerText || '').trim() || el.getAttribute('title') || '',
+    el.getAttribute('href') || '',
+])
+"""
+
+_BUTTONS_JS = """
+(els, limit) => els.slice(0, limit || els.length).map(el => ({
+    text: ((el.innerText || '') || el.getAttribute('value') || '').trim(),
+    type: el.getAttribute('type') || 'button',
+}))
+"""
+
+_INPUTS_JS = """
+(els, limit) => els.slice(0, limit || els.length).map(el => ({
+    type: el.getAttribute('type') || el.tagName.toLowerCase(),
+    name: el.getAttribute('name') || '',
+    placeholder: el.getAttribute('placeholder') || '',
+}))
+"""
+
+_HEADINGS_JS = """
+(els, limit) => els.slice(0, limit || els.length)
+    .map(el => ({ level: el.tagName.toLowerCase(), text: (el.innerText || '').trim() }))
+    .filter(item => item.text)
+"""
+
+
+def _normalize_links(raw_links: List[List[str]], current_url: str) -> List[Dict[str, str]]:
+    """把 [标题, href] 列表解析为绝对 http(s) URL，丢弃其他协议（javascript:、mailto: 等）。"""
+    results: List[Dict[str, str]] = []
+    for title, href in raw_links:
+        if not href:
+            continue
+        normalized_url = urljoin(current_url, href.strip())
+        if normalized_url.startswith(("http://", "https://")):
+            results.append({
+                "title": title or normalized_url,
+                "url": normalized_url
+            })
+    return results
+
+
+def _first_text(
+    page: Page,
+    root_selector: Optional[str],
+    selectors: List[str],
+    attr: Optional[str] = None,
+    min_length: int = 0,
+) -> str:
+    """
+    在 root_selector（为空时为整个文档）范围内，返回第一个命中选择器的非空文本。
+
+    单次 evaluate 完成全部选择器的检查；根元素不存在时返回空字符串。
+    """
+    try:
+        return page.eval_on_selector(
+            root_selector or "html", _FIRST_TEXT_JS, [selectors, attr, min_length]
+        ) or ""
+    except Exception:
+        return ""
+
+
 def extract_full_html(page: Page, selector: Optional[str] = None) -> str:
     """
     提取页面的完整 HTML 源码。
@@ -44,44 +130,10 @@ def extract_all_links(page: Page, current_url: str, limit: Optional[int] = None)
     :param limit: 可选的最大提取数量，None 表示提取全部
     :return: 链接列表，每个链接包含 title 和 url
     """
-    results: List[Dict[str, str]] = []
-    
     try:
-        # 查找所有链接元素
-        links = page.locator("a[href]")
-        count = links.count()
-        
-        if limit:
-            count = min(count, limit)
-        
-        for idx in range(count):
-            try:
-                link = links.nth(idx)
-                
-                # 提取文本标题
-                title = ""
-                try:
-                    title = (link.inner_text() or "").strip()
-                    # 如果标题为空，尝试获取 title 属性
-                    if not title:
-                        title = link.get_attribute("title") or ""
-                except Exception:
-                    pass
-                
-                # 提取 URL
-                href = link.get_attribute("href") or ""
-                if href:
-                    # 规范化 URL
-                    normalized_url = urljoin(current_url, href.strip())
-                    if normalized_url and normalized_url.startswith(("http://", "https://")):
-                        results.append({
-                            "title": title or normalized_url,
-                            "url": normalized_url
-                        })
-            except Exception:
-                continue
-        
-        return results
+        # 标题（文本为空时取 title 属性）与 href 在页面内一次取回
+        raw_links = page.eval_on_selector_all("a[href]", _LINKS_JS, limit)
+        return _normalize_links(raw_links, current_url)
     except Exception as e:
         print(f"[page_content_extractor] Error extracting links: {e}")
         return []
@@ -125,69 +177,23 @@ def extract_all_elements(
         # 提取按钮
         if 'button' in element_types:
             try:
-                buttons = page.locator("button, input[type='button'], input[type='submit']")
-                count = buttons.count()
-                if limit_per_type:
-                    count = min(count, limit_per_type)
-                
-                for idx in range(count):
-                    try:
-                        btn = buttons.nth(idx)
-                        text = (btn.inner_text() or btn.get_attribute("value") or "").strip()
-                        btn_type = btn.get_attribute("type") or "button"
-                        result["buttons"].append({
-                            "text": text,
-                            "type": btn_type
-                        })
-                    except Exception:
-                        continue
+                result["buttons"] = page.eval_on_selector_all(
+                    "button, input[type='button'], input[type='submit']", _BUTTONS_JS, limit_per_type
+                )
             except Exception:
                 pass
         
         # 提取输入框
         if 'input' in element_types:
             try:
-                inputs = page.locator("input, textarea, select")
-                count = inputs.count()
-                if limit_per_type:
-                    count = min(count, limit_per_type)
-                
-                for idx in range(count):
-                    try:
-                        inp = inputs.nth(idx)
-                        inp_type = inp.get_attribute("type") or inp.tag_name().lower()
-                        name = inp.get_attribute("name") or ""
-                        placeholder = inp.get_attribute("placeholder") or ""
-                        result["inputs"].append({
-                            "type": inp_type,
-                            "name": name,
-                            "placeholder": placeholder
-                        })
-                    except Exception:
-                        continue
+                result["inputs"] = page.eval_on_selector_all("input, textarea, select", _INPUTS_JS, limit_per_type)
             except Exception:
                 pass
         
         # 提取标题
         if any(f'h{i}' in element_types for i in range(1, 7)):
             try:
-                headings = page.locator("h1, h2, h3, h4, h5, h6")
-                count = headings.count()
-                if limit_per_type:
-                    count = min(count, limit_per_type)
-                
-                for idx in range(count):
-                    try:
-                        heading = headings.nth(idx)
-                        level = heading.evaluate("el => el.tagName.toLowerCase()")
-                        text = (heading.inner_text() or "").strip()
-                        if text:
-                            result["headings"].append({
-                                "level": level,
-                                "text": text
-                            })
-                    except Exception:
-                        continue
+                result["headings"] = page.eval_on_selector_all("h1, h2, h3, h4, h5, h6", _HEADINGS_JS, limit_per_type)
             except Exception:
                 pass
         
@@ -243,16 +249,7 @@ def extract_blog_content(
         target_element = page.locator(selector).first if selector else page
         
         # 提取标题（优先查找h1，其次h2）
-        try:
-            title_elem = target_element.locator("h1").first
-            if title_elem.count() > 0:
-                result["title"] = (title_elem.inner_text() or "").strip()
-            else:
-                title_elem = target_element.locator("h2").first
-                if title_elem.count() > 0:
-                    result["title"] = (title_elem.inner_text() or "").strip()
-        except Exception:
-            pass
+        result["title"] = _first_text(page, selector, ["h1", "h2"])
         
         # 提取正文内容（智能提取主要文本区域）
         try:
@@ -269,16 +266,8 @@ def extract_blog_content(
                 ".main-content"
             ]
             
-            content_text = ""
-            for sel in content_selectors:
-                try:
-                    content_elem = target_element.locator(sel).first
-                    if content_elem.count() > 0:
-                        content_text = (content_elem.inner_text() or "").strip()
-                        if len(content_text) > 100:  # 如果内容足够长，使用它
-                            break
-                except Exception:
-                    continue
+            # 内容足够长（超过100字符）的第一个容器即为正文
+            content_text = _first_text(page, selector, content_selectors, min_length=101)
             
             # 策略2: 如果没有找到特定容器，提取整个页面的主要文本
             if not content_text or len(content_text) < 100:
@@ -302,48 +291,25 @@ def extract_blog_content(
             print(f"[page_content_extractor] Error extracting blog content: {e}")
         
         # 尝试提取作者信息
-        try:
-            author_selectors = [
-                ".author",
-                "[class*='author']",
-                "[class*='writer']",
-                ".byline",
-                "[itemprop='author']"
-            ]
-            for sel in author_selectors:
-                try:
-                    author_elem = target_element.locator(sel).first
-                    if author_elem.count() > 0:
-                        result["author"] = (author_elem.inner_text() or "").strip()
-                        if result["author"]:
-                            break
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        author_selectors = [
+            ".author",
+            "[class*='author']",
+            "[class*='writer']",
+            ".byline",
+            "[itemprop='author']"
+        ]
+        result["author"] = _first_text(page, selector, author_selectors)
         
         # 尝试提取发布时间
-        try:
-            time_selectors = [
-                "time",
-                "[datetime]",
-                ".publish-time",
-                "[class*='time']",
-                "[class*='date']",
-                "[itemprop='datePublished']"
-            ]
-            for sel in time_selectors:
-                try:
-                    time_elem = target_element.locator(sel).first
-                    if time_elem.count() > 0:
-                        time_text = time_elem.get_attribute("datetime") or time_elem.inner_text()
-                        if time_text:
-                            result["publish_time"] = time_text.strip()
-                            break
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        time_selectors = [
+            "time",
+            "[datetime]",
+            ".publish-time",
+            "[class*='time']",
+            "[class*='date']",
+            "[itemprop='datePublished']"
+        ]
+        result["publish_time"] = _first_text(page, selector, time_selectors, attr="datetime")
         
         return result
     except Exception as e:
@@ -392,27 +358,8 @@ def extract_page_content(
             if selector:
                 # 如果指定了选择器，只在选择器范围内提取链接
                 container = page.locator(selector).first
-                links = container.locator("a[href]")
-                count = links.count()
-                if limit:
-                    count = min(count, limit)
-                
-                links_data = []
-                for idx in range(count):
-                    try:
-                        link = links.nth(idx)
-                        title = (link.inner_text() or "").strip()
-                        href = link.get_attribute("href") or ""
-                        if href:
-                            normalized_url = urljoin(current_url, href.strip())
-                            if normalized_url.startswith(("http://", "https://")):
-                                links_data.append({
-                                    "title": title or normalized_url,
-                                    "url": normalized_url
-                                })
-                    except Exception:
-                        continue
-                result["data"] = {"links": links_data}
+                raw_links = container.locator("a[href]").evaluate_all(_LINKS_JS, limit)
+                result["data"] = {"links": _normalize_links(raw_links, current_url)}
             else:
                 result["data"] = {"links": extract_all_links(page, current_url, limit=limit)}
         
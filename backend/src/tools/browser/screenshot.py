@@ -5,12 +5,50 @@
 """
 
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 from playwright.sync_api import Page
 
 from backend.src.utils.path_utils import build_temp_file_path
 
+# 尚未完成的后台写盘线程，以及写盘失败的 (路径, 异常)
+_pending_writes: List[threading.Thread] = []
+_failed_writes: List[Tuple[str, OSError]] = []
+_pending_lock = threading.Lock()
+
+
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+def _write_bytes_in_background(path: str, data: bytes) -> None:
+    """后台线程中的异常不会传给调用方，记录下来由 wait_for_screenshot_writes() 抛出。"""
+    try:
+        _write_bytes(path, data)
+    except OSError as exc:
+        with _pending_lock:
+            _failed_writes.append((path, exc))
+
+
+def wait_for_screenshot_writes() -> None:
+    """
+    等待所有后台截图写盘完成，读取截图文件前调用。
+    自上次调用以来有截图写盘失败时抛出 OSError，消息中列出失败的文件路径。
+    """
+    with _pending_lock:
+        pending = list(_pending_writes)
+        _pending_writes.clear()
+    for thread in pending:
+        thread.join()
+    with _pending_lock:
+        failed = list(_failed_writes)
+        _failed_writes.clear()
+    if failed:
+        paths = ", ".join(path for path, _ in failed)
+        raise OSError(f"Failed to write screenshot(s): {paths}") from failed[0][1]
+
 
 def take_screenshot(
     page: Page,
@@ -18,6 +56,10 @@ def take_screenshot(
     filename: Optional[str] = None,
     full_page: bool = True,
     custom_path: Optional[str] = None,
+    write_in_background: bool = False,
+    data: Optional[bytes] = None,
+    image_format: str = "png",
+    quality: Optional[int] = None,
 ) -> str:
     """
     对当前页面进行截图，并返回截图的完整文件路径。
@@ -25,20 +67,40 @@ def take_screenshot(
     - 如果指定 custom_path，则直接使用该路径（调用方需保证路径合法）；
     - 否则若提供 filename，则将其保存在 temp/screenshots 目录下；
     - 如果两者都未提供，则根据任务主题自动生成文件名：temp/screenshots/{topic}_{ts}.png。
+    - write_in_background=True 时在后台线程写盘并立即返回路径，
+      读取文件前需调用 wait_for_screenshot_writes()。
+    - 传入 data（调用方已截取的图片字节，格式需与 image_format 一致）时直接写盘，不再重新截图。
+    - image_format 为 "png"（默认，无损）或 "jpeg"；quality 只对 jpeg 生效（0-100）。
+      OCR 等只需识别文字的场景可使用 jpeg，文件体积小得多。
     """
+    extension = ".jpg" if image_format == "jpeg" else ".png"
+    options: Dict[str, Any] = {"full_page": full_page, "type": image_format}
+    if image_format == "jpeg" and quality is not None:
+        options["quality"] = quality
+
     if custom_path:
         path = os.path.abspath(custom_path)
         os.makedirs(os.path.dirname(path), exist_ok=True)
     elif filename:
         base_dir = os.path.dirname(
-            build_temp_file_path("screenshots", task_topic=task_topic, extension=".png")
+            build_temp_file_path("screenshots", task_topic=task_topic, extension=extension)
         )
         os.makedirs(base_dir, exist_ok=True)
         path = os.path.join(base_dir, filename)
     else:
-        path = build_temp_file_path("screenshots", task_topic=task_topic, extension=".png")
+        path = build_temp_file_path("screenshots", task_topic=task_topic, extension=extension)
 
-    page.screenshot(path=path, full_page=full_page)
+    if data is None and write_in_background:
+        data = page.screenshot(**options)
+    if data is None:
+        page.screenshot(path=path, **options)
+    elif write_in_background:
+        thread = threading.Thread(target=_write_bytes_in_background, args=(path, data), name="screenshot-writer")
+        with _pending_lock:
+            _pending_writes.append(thread)
+        thread.start()
+    else:
+        _write_bytes(path, data)
     return os.path.abspath(path)
 
 
@@ -12,6 +12,30 @@ from urllib.parse import urljoin
 from playwright.sync_api import Page, TimeoutError
 
 
+# 在页面内批量提取「标题 + 链接」：
+# 标题取 innerText 或指定属性；自身没有 href/data-url 时回退到第一个子链接。
+_EXTRACT_ITEMS_JS = """
+(els, { attribute, limit }) => {
+    const picked = limit == null ? els : els.slice(0, limit);
+    return picked.map(el => {
+        let title = attribute === 'text' ? (el.innerText || '') : (el.getAttribute(attribute) || '');
+        title = title.trim();
+        let href = el.getAttribute('href') || el.getAttribute('data-url') || '';
+        if (!href) {
+            const nested = el.querySelector('a[href]');
+            if (nested) {
+                href = nested.getAttribute('href') || nested.getAttribute('data-url') || '';
+                if (!title) {
+                    title = (nested.innerText || '').trim();
+                }
+            }
+        }
+        return { title, href };
+    });
+}
+"""
+
+
 def _normalize_link(current_url: str, href: Optional[str]) -> str:
     if not href:
         return ""
@@ -43,43 +67,15 @@ def extract_search_results(
     """
     results: List[Dict[str, str]] = []
 
-    def _extract_from_locator(target_selector: str, max_items: int) -> None:
-        elements = page.locator(target_selector)
-        count = min(elements.count(), max_items)
-        for idx in range(count):
-            element = elements.nth(idx)
-            title_value = ""
-            try:
-                if attribute == "text":
-                    title_value = (element.inner_text() or "").strip()
-                else:
-                    attr_value = element.get_attribute(attribute)
-                    if attr_value:
-                        title_value = attr_value.strip()
-            except Exception:
-                title_value = ""
-
-            href_value = element.get_attribute("href") or element.get_attribute("data-url")
-
-            # 如果自身没有 href，尝试寻找子节点上的链接
-            if not href_value:
-                try:
-                    nested_candidates = element.locator("a[href]")
-                    if nested_candidates.count() > 0:
-                        nested_link = nested_candidates.first
-                        href_candidate = nested_link.get_attribute("href") or nested_link.get_attribute("data-url")
-                        if href_candidate:
-                            href_value = href_candidate
-                        if not title_value:
-                            try:
-                                title_value = (nested_link.inner_text() or "").strip()
-                            except Exception:
-                                pass
-                except Exception:
-                    pass
-
+    def _extract_from_locator(target_selector: str, max_items: Optional[int]) -> None:
+        # 在页面内一次性完成遍历，避免逐元素 inner_text/get_attribute 的往返调用
+        raw_items = page.eval_on_selector_all(
+            target_selector, _EXTRACT_ITEMS_JS, {"attribute": attribute, "limit": max_items}
+        )
+        for item in raw_items:
+            href_value = item.get("href")
             normalized_url = _normalize_link(current_url, href_value) if href_value else ""
-            _append_result(results, title_value, normalized_url)
+            _append_result(results, item.get("title"), normalized_url)
 
     # 1. 如果上层已经提供了 selector，则优先使用
     if selector:
@@ -96,44 +92,11 @@ def extract_search_results(
                     # 容器未在超时时间内出现，直接返回空结果
                     return results
 
-                container = page.locator("#content_left")
-                link_selector = "h3 a[href], h3 > a[href]"
-                link_elements = container.locator(link_selector)
-                count = min(link_elements.count(), limit)
-                for idx in range(count):
-                    element = link_elements.nth(idx)
-                    title = ""
-                    href = ""
-                    try:
-                        title = (element.inner_text() or "").strip()
-                    except Exception:
-                        title = ""
-                    try:
-                        href = element.get_attribute("href") or element.get_attribute("data-url") or ""
-                    except Exception:
-                        href = ""
-
-                    normalized_url = _normalize_link(current_url, href) if href else ""
-                    _append_result(results, title, normalized_url)
+                _extract_from_locator("#content_left h3 a[href]", limit)
 
             # 通用兜底：提取页面上其它可点击链接
             if not results:
-                generic_links = page.locator("a[href]")
-                count = min(generic_links.count(), limit)
-                for idx in range(count):
-                    element = generic_links.nth(idx)
-                    title = ""
-                    href = ""
-                    try:
-                        title = (element.inner_text() or "").strip()
-                    except Exception:
-                        title = ""
-                    try:
-                        href = element.get_attribute("href") or ""
-                    except Exception:
-                        href = ""
-                    normalized_url = _normalize_link(current_url, href) if href else ""
-                    _append_result(results, title, normalized_url)
+                _extract_from_locator("a[href]", limit)
 
         except Exception as e:
             print(f"[browser.search_results] Fallback extract_search_results failed: {e}")
@@ -6,8 +6,10 @@
 
 from .ocr_tool import (  # noqa: F401
     extract_text_from_image,
+    extract_text_from_image_bytes,
     extract_text_from_screenshot,
     batch_extract_text_from_images,
+    prewarm_ocr_reader,
 )
 from .ocr_analyzer import (  # noqa: F401
     analyze_ocr_text_with_llm,
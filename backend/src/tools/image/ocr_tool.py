@@ -5,7 +5,10 @@ OCR 图像文字识别工具。
 支持中英文识别，适用于截图、图片文件等场景。
 """
 
+import hashlib
 import os
+import threading
+from collections import OrderedDict, defaultdict
 from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 
@@ -46,6 +49,25 @@ except ImportError:
 
 # 全局OCR读取器实例（延迟初始化）
 _ocr_reader: Optional[Any] = None
+# 后台预热与首次识别可能同时触发初始化，加锁保证只创建一个读取器
+_ocr_reader_lock = threading.Lock()
+_ocr_prewarmed = False
+
+# 批量识别时每批送入 readtext_batched 的图片数量上限
+OCR_BATCH_SIZE = int(os.getenv("OCR_BATCH_SIZE", "8"))
+
+# 是否使用 GPU 推理（默认 CPU，更通用）。启用时同时打开 cuDNN benchmark，
+# 截图尺寸基本固定，首次调优后的卷积算法可以一直复用
+OCR_USE_GPU = os.getenv("OCR_USE_GPU", "False").lower() == "true"
+
+# 识别结果缓存（LRU）：key 为 (图片内容 SHA-256, 语言, detail)，同一张图片重复识别时直接返回。
+# 按内容精确匹配，页面上任何文字变化都会得到新的 key，不会返回过期结果
+_OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_SIZE", "128"))
+_ocr_cache: "OrderedDict[Tuple[bytes, Tuple[str, ...], int], Dict[str, Any]]" = OrderedDict()
+_ocr_cache_lock = threading.Lock()
+
+# 识别阶段每次前向计算处理的文本框数量（readtext 的 batch_size），整页截图通常包含大量文本框
+OCR_RECOGNIZER_BATCH_SIZE = int(os.getenv("OCR_RECOGNIZER_BATCH_SIZE", "32" if OCR_USE_GPU else "8"))
 
 
 def _get_ocr_reader(languages: List[str] = None) -> Any:
@@ -74,19 +96,131 @@ def _get_ocr_reader(languages: List[str] = None) -> Any:
     if _ocr_reader is not None:
         return _ocr_reader
     
-    # 创建新的读取器（首次调用时会下载模型，可能需要一些时间）
-    print(f"[ocr_tool] Initializing EasyOCR reader with languages: {languages}")
-    print("[ocr_tool] Note: First-time initialization may download models, please wait...")
-    _ocr_reader = easyocr.Reader(languages, gpu=False)  # 使用CPU模式，更通用
-    print("[ocr_tool] EasyOCR reader initialized successfully")
+    with _ocr_reader_lock:
+        if _ocr_reader is not None:
+            return _ocr_reader
+        # 创建新的读取器（首次调用时会下载模型，可能需要一些时间）
+        print(f"[ocr_tool] Initializing EasyOCR reader with languages: {languages}")
+        print("[ocr_tool] Note: First-time initialization may download models, please wait...")
+        # quantize：CPU 模式下对模型做动态 int8 量化
+        _ocr_reader = easyocr.Reader(
+            languages,
+            gpu=OCR_USE_GPU,
+            quantize=True,
+            cudnn_benchmark=OCR_USE_GPU,
+        )
+        print("[ocr_tool] EasyOCR reader initialized successfully")
     
     return _ocr_reader
 
 
+def prewarm_ocr_reader(languages: List[str] = None) -> None:
+    """
+    预热 OCR：加载模型并对一张空白图执行一次识别（GPU 模式下同时完成 cuDNN 调优）。
+    进程内只执行一次，失败时只打印警告，首次真实识别时会重新尝试初始化。
+    """
+    global _ocr_prewarmed
+    if _ocr_prewarmed or not EASYOCR_AVAILABLE:
+        return
+    _ocr_prewarmed = True
+    try:
+        import numpy as np
+
+        reader = _get_ocr_reader(languages)
+        reader.readtext(np.zeros((720, 1280, 3), dtype=np.uint8), detail=0)
+        print("[ocr_tool] EasyOCR reader warmed up")
+    except Exception as e:
+        print(f"[ocr_tool] Warning: OCR prewarm failed: {e}")
+
+
+def _ocr_cache_key(image_bytes: bytes, languages: Optional[List[str]], detail: int) -> Tuple[bytes, Tuple[str, ...], int]:
+    return hashlib.sha256(image_bytes).digest(), tuple(languages or ("ch_sim", "en")), detail
+
+
+def _ocr_cache_get(key: Tuple[bytes, Tuple[str, ...], int]) -> Optional[Dict[str, Any]]:
+    with _ocr_cache_lock:
+        result = _ocr_cache.get(key)
+        if result is None:
+            return None
+        _ocr_cache.move_to_end(key)
+    return dict(result)
+
+
+def _ocr_cache_put(key: Tuple[bytes, Tuple[str, ...], int], result: Dict[str, Any]) -> None:
+    if _OCR_CACHE_MAX_ENTRIES <= 0 or not result.get("success"):
+        return
+    with _ocr_cache_lock:
+        _ocr_cache[key] = dict(result)
+        _ocr_cache.move_to_end(key)
+        while len(_ocr_cache) > _OCR_CACHE_MAX_ENTRIES:
+            _ocr_cache.popitem(last=False)
+
+
+def _unavailable_result() -> Dict[str, Any]:
+    """EasyOCR 不可用时的失败结果（附带安装/修复提示）。"""
+    error_msg = "EasyOCR is not available."
+    if EASYOCR_ERROR:
+        if "DLL" in EASYOCR_ERROR or "c10.dll" in EASYOCR_ERROR:
+            error_msg = (
+                "EasyOCR is installed but cannot load due to missing Visual C++ Redistributable.\n"
+                "Please install Visual C++ Redistributable from:\n"
+                "  https://aka.ms/vs/17/release/vc_redist.x64.exe\n"
+                "Or search for 'Visual C++ Redistributable 2015-2022'"
+            )
+        elif "not installed" in EASYOCR_ERROR.lower():
+            error_msg = "EasyOCR is not installed. Please install it with: pip install easyocr"
+        else:
+            error_msg = f"EasyOCR error: {EASYOCR_ERROR}"
+    else:
+        error_msg = "EasyOCR is not installed. Please install it with: pip install easyocr"
+    
+    return {
+        "success": False,
+        "error": error_msg,
+        "text": "",
+        "details": []
+    }
+
+
+def _format_ocr_results(results: List[Any], detail: int) -> Dict[str, Any]:
+    """把 EasyOCR 的 readtext 输出整理为统一的结果字典。"""
+    if detail == 0:
+        # 只返回文本列表
+        texts = [item for item in results if isinstance(item, str)]
+        full_text = "\n".join(texts)
+        return {
+            "success": True,
+            "text": full_text,
+            "details": []
+        }
+    else:
+        # 返回详细信息
+        text_parts = []
+        details = []
+        
+        for item in results:
+            if isinstance(item, tuple) and len(item) >= 2:
+                bbox, text, confidence = item[0], item[1], item[2] if len(item) > 2 else 1.0
+                text_parts.append(text)
+                details.append({
+                    "text": text,
+                    "bbox": bbox,
+                    "confidence": float(confidence)
+                })
+        
+        full_text = "\n".join(text_parts)
+        return {
+            "success": True,
+            "text": full_text,
+            "details": details
+        }
+
+
 def extract_text_from_image(
     image_path: str,
     languages: List[str] = None,
     detail: int = 0,
+    batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     从图片文件中提取文字内容。
@@ -94,6 +228,7 @@ def extract_text_from_image(
     :param image_path: 图片文件路径（支持常见格式：png, jpg, jpeg, bmp等）
     :param languages: OCR支持的语言列表，默认 ['ch_sim', 'en']
     :param detail: 详细信息级别，0=只返回文本，1=返回文本+位置+置信度
+    :param batch_size: 识别阶段的批大小，默认 OCR_RECOGNIZER_BATCH_SIZE
     :return: 提取结果字典，包含：
         - text: 提取的完整文本（字符串）
         - details: 详细信息列表（如果detail=1），每个元素包含：
@@ -102,75 +237,64 @@ def extract_text_from_image(
             - confidence: 置信度
     """
     if not EASYOCR_AVAILABLE:
-        error_msg = "EasyOCR is not available."
-        if EASYOCR_ERROR:
-            if "DLL" in EASYOCR_ERROR or "c10.dll" in EASYOCR_ERROR:
-                error_msg = (
-                    "EasyOCR is installed but cannot load due to missing Visual C++ Redistributable.\n"
-                    "Please install Visual C++ Redistributable from:\n"
-                    "  https://aka.ms/vs/17/release/vc_redist.x64.exe\n"
-                    "Or search for 'Visual C++ Redistributable 2015-2022'"
-                )
-            elif "not installed" in EASYOCR_ERROR.lower():
-                error_msg = "EasyOCR is not installed. Please install it with: pip install easyocr"
-            else:
-                error_msg = f"EasyOCR error: {EASYOCR_ERROR}"
-        else:
-            error_msg = "EasyOCR is not installed. Please install it with: pip install easyocr"
-        
+        return _unavailable_result()
+    
+    if not os.path.exists(image_path):
         return {
             "success": False,
-            "error": error_msg,
+            "error": f"Image file not found: {image_path}",
             "text": "",
             "details": []
         }
     
-    if not os.path.exists(image_path):
+    try:
+        with open(image_path, "rb") as f:
+            image_bytes = f.read()
+    except OSError as e:
         return {
             "success": False,
-            "error": f"Image file not found: {image_path}",
+            "error": f"Failed to read image file {image_path}: {e}",
             "text": "",
             "details": []
         }
     
+    print(f"[ocr_tool] Extracting text from image: {image_path}")
+    return extract_text_from_image_bytes(image_bytes, languages, detail, batch_size)
+
+
+def extract_text_from_image_bytes(
+    image_bytes: bytes,
+    languages: List[str] = None,
+    detail: int = 0,
+    batch_size: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    从内存中的图片数据（PNG/JPEG 等编码后的字节）提取文字内容。
+    
+    截图后直接识别时使用，省去写盘再读盘的往返。结果格式与 extract_text_from_image 相同。
+    
+    :param image_bytes: 编码后的图片字节
+    :param languages: OCR支持的语言列表，默认 ['ch_sim', 'en']
+    :param detail: 详细信息级别
+    :param batch_size: 识别阶段的批大小，默认 OCR_RECOGNIZER_BATCH_SIZE
+    :return: 提取结果字典
+    """
+    if not EASYOCR_AVAILABLE:
+        return _unavailable_result()
+    
     try:
-        reader = _get_ocr_reader(languages)
+        cache_key = _ocr_cache_key(image_bytes, languages, detail)
+        cached = _ocr_cache_get(cache_key)
+        if cached is not None:
+            print("[ocr_tool] OCR cache hit")
+            return cached
         
-        # 执行OCR识别
-        print(f"[ocr_tool] Extracting text from image: {image_path}")
-        results = reader.readtext(image_path, detail=detail)
+        reader = _get_ocr_reader(languages)
+        results = reader.readtext(image_bytes, detail=detail, batch_size=batch_size or OCR_RECOGNIZER_BATCH_SIZE)
         
-        # 处理结果
-        if detail == 0:
-            # 只返回文本列表
-            texts = [item for item in results if isinstance(item, str)]
-            full_text = "\n".join(texts)
-            return {
-                "success": True,
-                "text": full_text,
-                "details": []
-            }
-        else:
-            # 返回详细信息
-            text_parts = []
-            details = []
-            
-            for item in results:
-                if isinstance(item, tuple) and len(item) >= 2:
-                    bbox, text, confidence = item[0], item[1], item[2] if len(item) > 2 else 1.0
-                    text_parts.append(text)
-                    details.append({
-                        "text": text,
-                        "bbox": bbox,
-                        "confidence": float(confidence)
-                    })
-            
-            full_text = "\n".join(text_parts)
-            return {
-                "success": True,
-                "text": full_text,
-                "details": details
-            }
+        result = _format_ocr_results(results, detail)
+        _ocr_cache_put(cache_key, result)
+        return result
     
     except Exception as e:
         print(f"[ocr_tool] Error during OCR extraction: {e}")
@@ -186,6 +310,7 @@ def extract_text_from_screenshot(
     screenshot_path: str,
     languages: List[str] = None,
     detail: int = 0,
+    batch_size: Optional[int] = None,
 ) -> Dict[str, Any]:
     """
     从截图文件中提取文字内容（extract_text_from_image的别名，语义更清晰）。
@@ -193,28 +318,64 @@ def extract_text_from_screenshot(
     :param screenshot_path: 截图文件路径
     :param languages: OCR支持的语言列表
     :param detail: 详细信息级别
+    :param batch_size: 识别阶段的批大小
     :return: 提取结果字典
     """
-    return extract_text_from_image(screenshot_path, languages, detail)
+    return extract_text_from_image(screenshot_path, languages, detail, batch_size)
 
 
 def batch_extract_text_from_images(
     image_paths: List[str],
     languages: List[str] = None,
     detail: int = 0,
+    batch_size: Optional[int] = None,
 ) -> List[Dict[str, Any]]:
     """
     批量从多个图片文件中提取文字内容。
     
+    尺寸相同的图片按 OCR_BATCH_SIZE 分批交给 reader.readtext_batched，共享检测/识别的前向计算；
+    尺寸唯一的图片（或批量识别失败时）逐张识别。
+    
     :param image_paths: 图片文件路径列表
     :param languages: OCR支持的语言列表
     :param detail: 详细信息级别
-    :return: 提取结果列表，每个元素对应一个图片的提取结果
+    :param batch_size: 识别阶段的批大小
+    :return: 提取结果列表，每个元素对应一个图片的提取结果（顺序与输入一致）
     """
-    results = []
-    for image_path in image_paths:
-        result = extract_text_from_image(image_path, languages, detail)
-        result["image_path"] = image_path  # 添加图片路径信息
-        results.append(result)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(image_paths)
+    
+    if EASYOCR_AVAILABLE and PIL_AVAILABLE and len(image_paths) > 1:
+        # 只读取文件头获取尺寸，按尺寸分组
+        groups: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        for idx, image_path in enumerate(image_paths):
+            try:
+                with Image.open(image_path) as img:
+                    groups[img.size].append(idx)
+            except Exception:
+                continue
+        
+        for indices in groups.values():
+            for start in range(0, len(indices), OCR_BATCH_SIZE):
+                chunk = indices[start:start + OCR_BATCH_SIZE]
+                if len(chunk) < 2:
+                    continue
+                try:
+                    reader = _get_ocr_reader(languages)
+                    print(f"[ocr_tool] Extracting text from {len(chunk)} images in one batch")
+                    batch_results = reader.readtext_batched(
+                        [image_paths[i] for i in chunk],
+                        detail=detail,
+                        batch_size=batch_size or OCR_RECOGNIZER_BATCH_SIZE,
+                    )
+                except Exception as e:
+                    print(f"[ocr_tool] Batched OCR failed, falling back to per-image extraction: {e}")
+                    continue
+                for i, image_results in zip(chunk, batch_results):
+                    results[i] = _format_ocr_results(image_results, detail)
+    
+    for idx, image_path in enumerate(image_paths):
+        if results[idx] is None:
+            results[idx] = extract_text_from_image(image_path, languages, detail, batch_size)
+        results[idx]["image_path"] = image_path  # 添加图片路径信息
     return results
 
@@ -0,0 +1,140 @@
+# 文件: tests/backend_tests/test_browser_service.py
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+
+from playwright.sync_api import Error
+
+from backend.src.data_models.decision_engine.decision_models import DecisionAction
+from backend.src.services import BrowserService as browser_module
+from backend.src.services.BrowserService import BrowserService
+
+
+def _make_action(tool_name: str, **tool_args) -> DecisionAction:
+    """构造一个最小可用的 DecisionAction。"""
+    return DecisionAction(
+        tool_name=tool_name,
+        tool_args=tool_args,
+        reasoning="test",
+        confidence_score=0.9,
+        expected_outcome="test",
+    )
+
+
+class TestBrowserServiceExecution(unittest.TestCase):
+    """使用模拟的 Page/BrowserContext 测试动作执行、结果缓存与导航事件处理，不启动浏览器。"""
+
+    def setUp(self):
+        self.page = MagicMock()
+        self.page.url = "https://example.com/list"
+        context = MagicMock()
+        context.pages = [self.page]
+
+        with patch.object(browser_module._pool, "acquire", return_value=context):
+            self.service = BrowserService(headless=True, storage_state_path="", user_data_dir="")
+
+        # 观测与页面稳定等待依赖真实页面，这里替换为固定结果
+        self.service._observe_page = MagicMock(return_value=(200, []))
+        self.service._settle_page = MagicMock()
+
+    def tearDown(self):
+        self.service._io_pool.shutdown(wait=True)
+
+    def _stub_tool(self, tool_name: str, side_effect=None) -> MagicMock:
+        handler = MagicMock(side_effect=side_effect)
+        self.service._tool_handlers[tool_name] = handler
+        return handler
+
+    def test_01_batch_stops_on_first_failure(self):
+        """批次中某一步失败后不再执行后续动作，反馈指明失败的步骤，并只构造一次观测。"""
+        navigate = self._stub_tool("navigate_to")
+        click = self._stub_tool("click_element", side_effect=Error("element not found"))
+        scroll = self._stub_tool("scroll")
+
+        observation = self.service.execute_actions([
+            _make_action("navigate_to", url="https://example.com"),
+            _make_action("click_element", selector="#missing"),
+            _make_action("scroll", direction="down"),
+        ])
+
+        navigate.assert_called_once()
+        click.assert_called_once()
+        scroll.assert_not_called()
+        feedback = observation.last_action_feedback
+        self.assertEqual(feedback.status, "FAILED")
+        self.assertEqual(feedback.error_code, "PLAYWRIGHT_ERROR")
+        self.assertTrue(feedback.message.startswith("Batch step #1 (click_element) failed"))
+        self.service._observe_page.assert_called_once()
+        # 只有批次最后一步才会等待页面稳定，失败的中间步骤不会触发
+        self.service._settle_page.assert_not_called()
+
+    def test_02_action_cache_invalidated_by_mutating_tool(self):
+        """只读工具的结果在同一页面上复用；变更类工具执行后缓存作废。"""
+        def _read_attribute(action, feedback, timeout_ms):
+            feedback.message = "href=/next"
+
+        read = self._stub_tool("get_element_attribute", side_effect=_read_attribute)
+        self._stub_tool("click_element")
+        read_action = _make_action("get_element_attribute", selector="a.next", attribute_name="href")
+
+        first = self.service.execute_action(read_action)
+        second = self.service.execute_action(read_action)
+        self.assertEqual(read.call_count, 1)
+        self.assertEqual(second.last_action_feedback.message, first.last_action_feedback.message)
+
+        self.service.execute_action(_make_action("click_element", selector="button.load-more"))
+        self.service.execute_action(read_action)
+        self.assertEqual(read.call_count, 2)
+
+    def test_03_main_frame_navigation_clears_login_cache(self):
+        """主框架导航时清空登录检测缓存，子框架导航不影响缓存。"""
+        self.page.on.assert_any_call("framenavigated", self.service._handle_frame_navigated)
+        self.service._login_cache[self.page.url] = (False, "")
+
+        sub_frame = MagicMock()
+        sub_frame.parent_frame = MagicMock()
+        self.service._handle_frame_navigated(sub_frame)
+        self.assertIn(self.page.url, self.service._login_cache)
+
+        main_frame = MagicMock()
+        main_frame.parent_frame = None
+        self.service._handle_frame_navigated(main_frame)
+        self.assertEqual(self.service._login_cache, {})
+        self.assertTrue(self.service._http_status_stale)
+
+    def test_04_notepad_error_code_reported_on_non_windows(self):
+        """非 Windows 平台上 open_notepad 报告工具自己的错误码，而不是通用的 EXECUTION_ERROR。"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            target = os.path.join(tmp_dir, "note.txt")
+            with patch.object(sys, "platform", "linux"):
+                observation = self.service.execute_action(
+                    _make_action("open_notepad", file_path=target, initial_content="hello")
+                )
+
+            feedback = observation.last_action_feedback
+            self.assertEqual(feedback.status, "FAILED")
+            self.assertEqual(feedback.error_code, "NOTEPAD_UNSUPPORTED_PLATFORM")
+            self.assertIn(target, feedback.message)
+            with open(target, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "hello")
+
+    def test_05_visual_tool_reloads_page_loaded_with_blocking(self):
+        """资源拦截下加载的页面在视觉类工具执行前关闭拦截并重新加载；未拦截时不重新加载。"""
+        screenshot = self._stub_tool("take_screenshot")
+        self.service._set_resource_blocking(True)
+
+        self.service.execute_action(_make_action("take_screenshot"))
+        self.page.unroute.assert_called_once_with("**/*", self.service._route_handler)
+        self.page.reload.assert_called_once()
+        self.assertFalse(self.service._blocking_resources)
+        screenshot.assert_called_once()
+
+        self.service.execute_action(_make_action("take_screenshot"))
+        self.page.reload.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# 文件: tests/backend_tests/test_decision_models.py
+
+import json
+import unittest
+
+from pydantic import ValidationError
+
+from backend.src.data_models.decision_engine.decision_models import (
+    ExecutionNode,
+    ExecutionNodeStatus,
+    WebObservation,
+)
+
+
+def _make_node_dict(**overrides) -> dict:
+    """构造一个最小可用的 ExecutionNode 字典。"""
+    data = {
+        "node_id": "N0",
+        "action": {
+            "tool_name": "navigate_to",
+            "tool_args": {"url": "https://example.com"},
+            "reasoning": "Start the task flow.",
+            "confidence_score": 0.9,
+            "expected_outcome": "Page loaded.",
+        },
+    }
+    data.update(overrides)
+    return data
+
+
+class TestExecutionNodeStatus(unittest.TestCase):
+
+    def test_01_status_accepts_name_string(self):
+        """JSON 计划中的名称字符串（大小写不敏感）应被解析为整数枚举。"""
+        node = ExecutionNode.model_validate(_make_node_dict(current_status="running"))
+        self.assertIs(node.current_status, ExecutionNodeStatus.RUNNING)
+
+    def test_02_status_serializes_as_name(self):
+        """序列化时输出名称字符串，并可原样回读。"""
+        node = ExecutionNode.model_validate(_make_node_dict(current_status="FAILED"))
+        self.assertEqual(node.model_dump()["current_status"], "FAILED")
+
+        payload = json.loads(node.model_dump_json())
+        self.assertEqual(payload["current_status"], "FAILED")
+        self.assertIs(ExecutionNode.model_validate(payload).current_status, ExecutionNodeStatus.FAILED)
+
+    def test_03_invalid_status_name_rejected(self):
+        """未知的状态名称应报告为校验错误，而不是抛出裸 KeyError。"""
+        with self.assertRaises(ValidationError) as ctx:
+            ExecutionNode.model_validate(_make_node_dict(current_status="DONE"))
+        self.assertIn("invalid status 'DONE'", str(ctx.exception))
+
+
+class TestWebObservationTimestamp(unittest.TestCase):
+
+    def test_01_timestamp_formatted_on_serialize(self):
+        """内部保存纳秒时间戳，序列化时输出 ISO 8601 字符串。"""
+        observation = WebObservation(
+            observation_timestamp_ns=1_700_000_000_123_456_789,
+            current_url="about:blank",
+            http_status_code=200,
+            page_load_time_ms=0,
+            key_elements=[],
+            memory_context="test",
+        )
+        dumped = observation.model_dump()
+        self.assertEqual(dumped["observation_timestamp_utc"], "2023-11-14T22:13:20.123456")
+        self.assertEqual(WebObservation.model_validate(dumped).observation_timestamp_ns, 1_700_000_000_123_456_789)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+# 文件: tests/backend_tests/test_page_scripts.py
+
+import unittest
+
+from playwright.sync_api import Error, sync_playwright
+
+from backend.src.tools.browser.find_link_by_text import find_link_by_text
+from backend.src.tools.browser.page_content_extractor import (
+    _first_text,
+    extract_all_links,
+)
+from backend.src.tools.browser.search_results import extract_search_results
+
+PAGE_URL = "https://example.com/list/"
+
+
+class TestInPageExtractors(unittest.TestCase):
+    """
+    在真实页面上运行批量提取脚本，核对 limit 与标题回退语义与原先逐元素实现一致。
+    未安装 Chromium（playwright install chromium）时跳过。
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls._playwright = sync_playwright().start()
+        try:
+            cls._browser = cls._playwright.chromium.launch()
+        except Error as e:
+            cls._playwright.stop()
+            raise unittest.SkipTest(f"Chromium is not available: {e}")
+        cls.page = cls._browser.new_page()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._browser.close()
+        cls._playwright.stop()
+
+    def test_01_links_limit_and_title_fallback(self):
+        """_LINKS_JS：文本为空时取 title 属性，再回退为 URL；limit 作用于过滤协议之前的 a[href]。"""
+        self.page.set_content(
+            '<a href="/a">Alpha</a>'
+            '<a href="/b" title="Beta title"></a>'
+            '<a href="/c"></a>'
+            '<a href="mailto:team@example.com">Mail</a>'
+            '<a>No href</a>'
+        )
+        expected = [
+            {"title": "Alpha", "url": "https://example.com/a"},
+            {"title": "Beta title", "url": "https://example.com/b"},
+            {"title": "https://example.com/c", "url": "https://example.com/c"},
+        ]
+        self.assertEqual(extract_all_links(self.page, PAGE_URL), expected)
+        self.assertEqual(extract_all_links(self.page, PAGE_URL, limit=2), expected[:2])
+        self.assertEqual(extract_all_links(self.page, PAGE_URL, limit=4), expected)
+
+    def test_02_first_text_selector_order_and_attr_fallback(self):
+        """_FIRST_TEXT_JS：按顺序跳过不存在、为空、过短或非法的选择器；属性缺失时回退到文本。"""
+        self.page.set_content(
+            '<article>'
+            '<h1 class="empty"></h1><h1 class="short">Hi</h1><h2 class="title">Real title</h2>'
+            '<time datetime="2024-01-02">Jan 2</time><span class="date">Jan 3</span>'
+            '</article>'
+        )
+        self.assertEqual(
+            _first_text(self.page, None, ["h1.missing", "h1.empty", "h1.short", "h2.title"], min_length=3),
+            "Real title",
+        )
+        self.assertEqual(_first_text(self.page, None, ["[[invalid", "h2.title"]), "Real title")
+        self.assertEqual(_first_text(self.page, "article", ["time"], attr="datetime"), "2024-01-02")
+        self.assertEqual(_first_text(self.page, "article", ["span.date"], attr="datetime"), "Jan 3")
+        self.assertEqual(_first_text(self.page, "#missing", ["h2.title"]), "")
+
+    def test_03_search_items_limit_and_nested_link_fallback(self):
+        """_EXTRACT_ITEMS_JS：自身没有 href/data-url 时取第一个子链接，标题为空时取子链接文本。"""
+        self.page.set_content(
+            '<div class="item" data-url="/d1" data-label="Label one">Direct</div>'
+            '<div class="item"><a href="/n2">Nested two</a></div>'
+            '<div class="item"><a href="/n3">Nested three</a></div>'
+        )
+        self.assertEqual(
+            extract_search_results(self.page, PAGE_URL, ".item", limit=2),
+            [
+                {"title": "Direct", "url": "https://example.com/d1"},
+                {"title": "Nested two", "url": "https://example.com/n2"},
+            ],
+        )
+        self.assertEqual(
+            extract_search_results(self.page, PAGE_URL, ".item", attribute="data-label", limit=3),
+            [
+                {"title": "Label one", "url": "https://example.com/d1"},
+                {"title": "Nested two", "url": "https://example.com/n2"},
+                {"title": "Nested three", "url": "https://example.com/n3"},
+            ],
+        )
+
+    def test_04_find_link_by_text_limit_and_normalized_match(self):
+        """_FIND_LINKS_JS：按规范化空白后的文本包含关键字匹配，只返回前 limit 个命中。"""
+        self.page.set_content(
+            '<a href="/1">Docs one</a>'
+            '<a href="/2">Other</a>'
+            '<a href="/3">Docs two</a>'
+            '<a href="/4">Docs three</a>'
+            '<a href="/5">Release\n    notes</a>'
+            "<a href=\"/6\">Tom's page</a>"
+        )
+        self.assertEqual(
+            find_link_by_text(self.page, "Docs", limit=2),
+            [{"text": "Docs one", "href": "/1"}, {"text": "Docs two", "href": "/3"}],
+        )
+        self.assertEqual(find_link_by_text(self.page, "Release notes"), [{"text": "Release notes", "href": "/5"}])
+        self.assertEqual(find_link_by_text(self.page, "Tom's"), [{"text": "Tom's page", "href": "/6"}])
+
+
+if __name__ == '__main__':
+    unittest.main()